@@ -0,0 +1,139 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Short-TTL, per-process cache of authenticated users keyed by user id.
+
+    Entries are handed out as shallow copies so a view mutating
+    ``request.user`` never leaks changes into other requests.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self.invalidate(user_id)
+            return None
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenBlacklist:
+    """
+    Revoked token ids, each kept until the token expires.
+
+    Revocations are written to the Django cache, which every worker shares
+    when ``CACHES`` points at a shared backend, and remembered in this
+    process so repeat checks skip the cache. Access tokens are not in the
+    simplejwt database blacklist, so with the default per-process cache a
+    revoked access token is only rejected by the worker that revoked it.
+    """
+    CACHE_PREFIX = 'revoked_token:'
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti, exp):
+        with self._lock:
+            self._entries[jti] = exp
+            self._purge()
+        timeout = exp - time.time()
+        if timeout > 0:
+            cache.set(self.CACHE_PREFIX + jti, exp, timeout)
+
+    def __contains__(self, jti):
+        exp = self._entries.get(jti)
+        if exp is None:
+            exp = cache.get(self.CACHE_PREFIX + jti)
+            if exp is None:
+                return False
+            with self._lock:
+                self._entries[jti] = exp
+        return exp > time.time()
+
+    def clear(self):
+        """Forget the ids remembered in this process; the cache keeps its copies."""
+        with self._lock:
+            self._entries.clear()
+
+    def _purge(self):
+        now = time.time()
+        expired = [jti for jti, exp in self._entries.items() if exp <= now]
+        for jti in expired:
+            del self._entries[jti]
+
+
+user_cache = UserCache(getattr(settings, 'AUTH_USER_CACHE_TTL', 60))
+token_blacklist = TokenBlacklist()
+
+
+def blacklist_token(token):
+    """Record a validated token as revoked for the rest of its lifetime."""
+    jti = token.get(api_settings.JTI_CLAIM)
+    if jti:
+        token_blacklist.add(jti, token['exp'])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that serves users from ``user_cache`` instead of
+    querying the user table on every request.
+    """
+
+    def get_user(self, validated_token):
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if jti and jti in token_blacklist:
+            raise InvalidToken(_('Token is blacklisted'))
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
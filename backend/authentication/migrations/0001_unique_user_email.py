@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Stop before creating the index if accounts already share an email, as
+    the baseline allowed, and list them so they can be fixed (e.g. in the
+    admin) before running migrate again.
+    """
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').values('email').annotate(accounts=Count('id'))
+        .filter(accounts__gt=1).order_by('email').values_list('email', flat=True)
+    )
+    if not duplicates:
+        return
+
+    lines = []
+    for email in duplicates[:20]:
+        usernames = User.objects.filter(email=email).order_by('id').values_list('username', flat=True)
+        lines.append(f"  {email}: {', '.join(usernames)}")
+    if len(duplicates) > 20:
+        lines.append(f'  ... and {len(duplicates) - 20} more')
+    raise RuntimeError(
+        'Cannot add the unique email index: these emails are used by more than one account. '
+        'Change or clear the duplicates, then run migrate again.\n' + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        # auth.User only enforces unique usernames; back the email check in
+        # register/profile with a partial unique index so concurrent sign-ups
+        # are resolved by the database. Blank emails stay allowed.
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX auth_user_email_uniq ON auth_user (email) WHERE email <> ''",
+            reverse_sql='DROP INDEX auth_user_email_uniq',
+        ),
+    ]
@@ -1,3 +1,49 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .authentication import token_blacklist, user_cache
+
+
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        token_blacklist.clear()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        self.client = APIClient()
+        response = self.client.post('/api/auth/login/', {'username': 'alice', 'password': 'password'})
+        self.access = response.data['access']
+        self.refresh = response.data['refresh']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def test_profile_update_invalidates_the_cached_user(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').data['first_name'], '')
+        self.assertIsNotNone(user_cache.get(self.user.id))
+
+        response = self.client.put('/api/auth/profile/', {'first_name': 'Alice'})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get('/api/auth/profile/').data['first_name'], 'Alice')
+
+    def test_saving_the_user_elsewhere_invalidates_the_cached_user(self):
+        self.client.get('/api/auth/profile/')
+
+        User.objects.filter(pk=self.user.pk).first().save()
+
+        self.assertIsNone(user_cache.get(self.user.id))
+
+    def test_logged_out_access_token_is_rejected(self):
+        response = self.client.post('/api/auth/logout/', {'refresh': self.refresh})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+    def test_revocation_is_read_back_from_the_shared_cache(self):
+        self.client.post('/api/auth/logout/', {'refresh': self.refresh})
+        # As seen by a worker that did not handle the logout.
+        token_blacklist.clear()
+        user_cache.clear()
+
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
@@ -5,7 +5,27 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from events.serializers import UserSerializer
+from .authentication import blacklist_token
+
+
+def _find_conflict(username, email, exclude_id=None):
+    """
+    Return an error message if the username or email is already taken,
+    checking both in a single query.
+    """
+    users = User.objects.filter(Q(username=username) | Q(email=email))
+    if exclude_id is not None:
+        users = users.exclude(id=exclude_id)
+
+    taken = list(users.values_list('username', 'email')[:2])
+    if any(taken_username == username for taken_username, _ in taken):
+        return 'Username already exists'
+    if taken:
+        return 'Email already exists'
+    return None
 
 
 @api_view(['POST'])
@@ -23,25 +43,29 @@ def register(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    if User.objects.filter(username=username).exists():
-        return Response(
-            {'error': 'Username already exists'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    conflict = _find_conflict(username, email)
+    if conflict:
+        return Response({'error': conflict}, status=status.HTTP_400_BAD_REQUEST)
 
-    if User.objects.filter(email=email).exists():
-        return Response(
-            {'error': 'Email already exists'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
-    user = User.objects.create_user(
-        username=username,
-        email=email,
-        password=password,
+    # Hash outside the transaction so concurrent sign-ups don't hold the
+    # write lock for the duration of the key derivation.
+    user = User(
+        username=User.normalize_username(username),
+        email=User.objects.normalize_email(email),
         first_name=first_name,
         last_name=last_name
     )
+    user.set_password(password)
+
+    try:
+        with transaction.atomic():
+            user.save()
+    except IntegrityError:
+        # Lost a race with a concurrent sign-up between the check and insert.
+        return Response(
+            {'error': _find_conflict(username, email) or 'Username or email already exists'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
     refresh = RefreshToken.for_user(user)
 
@@ -89,6 +113,9 @@ def logout(request):
         if refresh_token:
             token = RefreshToken(refresh_token)
             token.blacklist()
+            blacklist_token(token)
+        if request.auth is not None:
+            blacklist_token(request.auth)
         return Response({'message': 'Successfully logged out'})
     except Exception:
         return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
@@ -128,21 +155,20 @@ def profile(request):
             user.set_password(data.get('new_password'))
 
         # Check for duplicate username/email
-        if User.objects.filter(username=user.username).exclude(id=user.id).exists():
-            return Response(
-                {'error': 'Username already exists'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        conflict = _find_conflict(user.username, user.email, exclude_id=user.id)
+        if conflict:
+            return Response({'error': conflict}, status=status.HTTP_400_BAD_REQUEST)
 
-        if User.objects.filter(email=user.email).exclude(id=user.id).exists():
+        try:
+            with transaction.atomic():
+                user.save()
+            return Response(UserSerializer(user).data)
+        except IntegrityError:
             return Response(
-                {'error': 'Email already exists'},
+                {'error': _find_conflict(user.username, user.email, exclude_id=user.id)
+                    or 'Username or email already exists'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-        try:
-            user.save()
-            return Response(UserSerializer(user).data)
         except Exception as e:
             return Response(
                 {'error': 'Failed to update profile'},
@@ -2,6 +2,9 @@
 ASGI config for event_scheduler project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn event_scheduler.asgi:application``)
+so the server-sent events stream at /api/events/stream/ can hold connections
+open without tying up worker threads.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
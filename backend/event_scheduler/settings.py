@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'events',
     'authentication',
@@ -107,6 +108,27 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+#
+# The first hasher is used for new passwords. Hashes made by any of the
+# others still verify and are upgraded to the preferred one on login.
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+PREFERRED_PASSWORD_HASHER = os.getenv('PASSWORD_HASHER')
+if PREFERRED_PASSWORD_HASHER:
+    PASSWORD_HASHERS = [PREFERRED_PASSWORD_HASHER] + [
+        hasher for hasher in PASSWORD_HASHERS if hasher != PREFERRED_PASSWORD_HASHER
+    ]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -131,7 +153,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -144,6 +166,41 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
 }
 
+# Seconds an authenticated user is served from the in-process cache
+# before it is reloaded from the database. Profile changes invalidate the
+# entry only in the worker that saved them; other workers catch up within
+# this TTL.
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+# Access tokens revoked at logout are recorded in the default Django cache.
+# That is Django's per-process local-memory cache unless CACHES is set, so
+# run several workers only with a shared cache backend (e.g. Redis or
+# Memcached), or a logged-out access token stays valid on the other
+# workers, and after a restart, until it expires.
+
+# Expansion budgets for the occurrence endpoints. Longer ranges and larger
+# limits are rejected; ranges estimated to hold more occurrences than the
+# budget are cut short and marked as truncated.
+MAX_CALENDAR_RANGE_DAYS = 366
+MAX_OCCURRENCES_PER_REQUEST = 2000
+MAX_UPCOMING_LIMIT = 200
+TEAM_CALENDAR_MAX_OCCURRENCES = 5000
+
+# Fan-out backend for event change notifications streamed over SSE. The
+# in-process backend only reaches clients connected to the same worker.
+EVENT_CHANGE_BACKEND = 'events.notifications.InProcessBackend'
+
+# Seconds between keepalive comments on idle SSE connections.
+EVENT_STREAM_KEEPALIVE = 15
+
+# Age in days after which the archive_events command moves finished events
+# out of the Event table.
+EVENT_ARCHIVE_AFTER_DAYS = 365
+
+# Category usage counts are cached per user for this many seconds, or until
+# one of the user's events changes. Upcoming counts cover this many days.
+CATEGORY_STATS_CACHE_TTL = 300
+CATEGORY_UPCOMING_DAYS = 30
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOW_CREDENTIALS = True
@@ -167,6 +224,11 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
 ]
 
+CORS_EXPOSE_HEADERS = [
+    'x-occurrences-truncated',
+    'x-next-cursor',
+]
+
 CORS_ALLOW_METHODS = [
     'DELETE',
     'GET',
@@ -15,6 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
 
 urlpatterns = [
@@ -22,3 +23,6 @@ urlpatterns = [
     path('api/auth/', include('authentication.urls')),
     path('api/events/', include('events.urls')),
 ]
+
+# runserver serves static files itself; uvicorn needs these in development.
+urlpatterns += staticfiles_urlpatterns()
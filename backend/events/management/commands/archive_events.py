@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from events.models import Event, EventArchive
+from events.recurrence import RecurrenceGenerator
+from events.signals import archiving
+
+
+class Command(BaseCommand):
+    help = 'Move events whose last occurrence ended long ago into the EventArchive table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.EVENT_ARCHIVE_AFTER_DAYS,
+            help='Archive events whose last occurrence ended more than this many days ago.'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be archived.')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        cutoff = timezone.now().date() - timedelta(days=options['days'])
+
+        # Open-ended series never finish; the rest are checked exactly below.
+        candidates = Event.objects.filter(
+            Q(recurrence_type='none', end_datetime__date__lt=cutoff) |
+            (~Q(recurrence_type='none') & (
+                Q(recurrence_end_date__lt=cutoff) | Q(recurrence_end_date__isnull=True, recurrence_count__isnull=False)
+            ))
+        ).filter(start_datetime__date__lt=cutoff).prefetch_related('exceptions').order_by('id')
+
+        archived = 0
+        batch = []
+        for event in candidates.iterator(chunk_size=options['batch_size']):
+            generator = RecurrenceGenerator(event, {e.occurrence_index: e for e in event.exceptions.all()})
+            last_date = generator.last_occurrence_date()
+            if last_date is None or last_date >= cutoff:
+                continue
+            batch.append(EventArchive.from_event(event, last_date))
+            if len(batch) >= options['batch_size']:
+                archived += self._archive(batch, options['dry_run'])
+                batch = []
+        archived += self._archive(batch, options['dry_run'])
+
+        verb = 'Would archive' if options['dry_run'] else 'Archived'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {archived} events ending before {cutoff}'))
+
+    def _archive(self, archives, dry_run):
+        if not archives or dry_run:
+            return len(archives)
+        with transaction.atomic(), archiving():
+            EventArchive.objects.bulk_create(archives)
+            Event.objects.filter(id__in=[archive.id for archive in archives]).delete()
+        return len(archives)
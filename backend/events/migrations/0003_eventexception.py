@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-19 06:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_category_event_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurrence_index', models.PositiveIntegerField()),
+                ('is_cancelled', models.BooleanField(default=False)),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('start_datetime', models.DateTimeField(blank=True, null=True)),
+                ('end_datetime', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='events.event')),
+            ],
+            options={
+                'ordering': ['event', 'occurrence_index'],
+                'unique_together': {('event', 'occurrence_index')},
+            },
+        ),
+    ]
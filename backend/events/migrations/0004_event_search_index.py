@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+# Frozen copies of the SQL in events.search as of this migration, so later
+# changes to that module do not alter what the migration does.
+POSTGRES_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce(events_event.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(events_event.description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(
+        (SELECT name FROM events_category WHERE events_category.id = events_event.category_id), ''
+    )), 'C')
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE events_event ADD COLUMN search_vector tsvector')
+        schema_editor.execute(
+            'CREATE INDEX events_event_search_vector_gin ON events_event USING GIN (search_vector)'
+        )
+        schema_editor.execute(f'UPDATE events_event SET search_vector = {POSTGRES_VECTOR_SQL}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE events_event_fts USING fts5(title, description, category_name)'
+        )
+        schema_editor.execute(
+            'INSERT INTO events_event_fts (rowid, title, description, category_name) '
+            'SELECT e.id, e.title, e.description, COALESCE(c.name, \'\') '
+            'FROM events_event e LEFT JOIN events_category c ON c.id = e.category_id'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX events_event_search_vector_gin')
+        schema_editor.execute('ALTER TABLE events_event DROP COLUMN search_vector')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE events_event_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_eventexception'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0 on 2026-10-19 06:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_recurrence_metadata(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    events = list(Event.objects.all())
+    for event in events:
+        mask = 0
+        for weekday in event.weekdays or []:
+            mask |= 1 << int(weekday)
+        event.weekday_mask = mask
+        event.anchor_day = event.start_datetime.day
+        event.anchor_weekday = event.start_datetime.weekday()
+        event.anchor_nth = (event.start_datetime.day - 1) // 7 + 1
+    Event.objects.bulk_update(
+        events, ['weekday_mask', 'anchor_day', 'anchor_weekday', 'anchor_nth'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='anchor_day',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='anchor_nth',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='anchor_weekday',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='weekday_mask',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['recurrence_type', 'anchor_weekday'], name='events_even_recurre_314183_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['recurrence_type', 'anchor_day'], name='events_even_recurre_1453d2_idx'),
+        ),
+        migrations.RunPython(backfill_recurrence_metadata, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_recurrence_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='timezone',
+            field=models.CharField(blank=True, default='UTC', max_length=64),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0 on 2026-10-19 06:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_timezone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('start_datetime', models.DateTimeField()),
+                ('end_datetime', models.DateTimeField()),
+                ('recurrence_type', models.CharField(choices=[('none', 'No Recurrence'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly'), ('custom', 'Custom Pattern')], default='none', max_length=20)),
+                ('recurrence_interval', models.PositiveIntegerField(default=1)),
+                ('recurrence_end_date', models.DateField(blank=True, null=True)),
+                ('recurrence_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('weekdays', models.JSONField(blank=True, default=list)),
+                ('monthly_pattern', models.CharField(blank=True, default='date', max_length=20)),
+                ('timezone', models.CharField(blank=True, default='UTC', max_length=64)),
+                ('weekday_mask', models.PositiveSmallIntegerField(default=0)),
+                ('anchor_day', models.PositiveSmallIntegerField(default=1)),
+                ('anchor_weekday', models.PositiveSmallIntegerField(default=0)),
+                ('anchor_nth', models.PositiveSmallIntegerField(default=1)),
+                ('exceptions', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('last_occurrence_date', models.DateField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_events', to='events.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['start_datetime'],
+                'indexes': [models.Index(fields=['user', 'start_datetime'], name='events_even_user_id_37fb9f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0 on 2026-10-19 06:26
+
+from zoneinfo import ZoneInfo
+
+from django.db import migrations, models
+
+
+def backfill_anchor_month(apps, schema_editor):
+    # Anchors follow the series' local start, like Event.local_start().
+    for model_name in ('Event', 'EventArchive'):
+        model = apps.get_model('events', model_name)
+        rows = list(model.objects.all())
+        for row in rows:
+            start = row.start_datetime
+            if row.timezone not in ('', 'UTC', 'Etc/UTC'):
+                start = start.astimezone(ZoneInfo(row.timezone))
+            row.anchor_month = start.month
+        model.objects.bulk_update(rows, ['anchor_month'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_eventarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='anchor_month',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='eventarchive',
+            name='anchor_month',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.RunPython(backfill_anchor_month, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,13 @@
 from django.db import models
+from django.db.models.functions import Mod
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from datetime import datetime, timedelta
+import calendar
 import json
 
+from .timezones import UTC_KEYS, get_zone, is_valid_timezone
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -20,6 +24,102 @@ class Category(models.Model):
         return self.name
 
 
+class EventQuerySet(models.QuerySet):
+    def in_range(self, start_date, end_date):
+        """
+        Narrow to events that can have an occurrence between ``start_date``
+        and ``end_date``: one-off events starting in the range and series
+        that start before it ends and are not finished before it begins.
+        A single day is narrowed further with the recurrence metadata columns.
+        """
+        if start_date == end_date:
+            return self.active_on(start_date)
+        return self.filter(self._range_filter(start_date, end_date))
+
+    def in_ranges(self, ranges):
+        """Like ``in_range`` for any of several ``(start_date, end_date)`` ranges, in one query."""
+        if len(ranges) == 1:
+            return self.in_range(*ranges[0])
+        condition = models.Q()
+        for start_date, end_date in ranges:
+            condition |= self._range_filter(start_date, end_date)
+        return self.filter(condition)
+
+    @staticmethod
+    def _range_filter(start_date, end_date):
+        # Series dates are local to their timezone, which can be a day ahead
+        # of the UTC start date.
+        return models.Q(start_datetime__date__lte=end_date + timedelta(days=1)) & (
+            models.Q(recurrence_type='none', start_datetime__date__gte=start_date,
+                     start_datetime__date__lte=end_date) |
+            (~models.Q(recurrence_type='none') & (
+                models.Q(recurrence_end_date__isnull=True) | models.Q(recurrence_end_date__gte=start_date)
+            ))
+        )
+
+    def on_weekday(self, weekday):
+        """Events with an occurrence on the given weekday (Monday is 0)."""
+        bit = 1 << weekday
+        return self.annotate(
+            weekday_match=models.F('weekday_mask').bitand(bit),
+            interval_weeks=Mod('recurrence_interval', 7),
+        ).filter(
+            models.Q(recurrence_type='weekly', weekday_match__gt=0) |
+            models.Q(anchor_weekday=weekday, recurrence_type__in=['none', 'weekly', 'custom']) |
+            models.Q(recurrence_type='monthly', monthly_pattern__in=['weekday', 'last_weekday'],
+                     anchor_weekday=weekday) |
+            # Daily series stepping whole weeks stay on their start weekday.
+            (models.Q(recurrence_type='daily') & ~models.Q(interval_weeks=0)) |
+            models.Q(recurrence_type='daily', interval_weeks=0, anchor_weekday=weekday) |
+            models.Q(recurrence_type='yearly') |
+            models.Q(recurrence_type='monthly', monthly_pattern='date')
+        )
+
+    def active_on(self, day):
+        """
+        Narrow to events that may occur on ``day`` using the indexed
+        recurrence metadata, plus series with an occurrence moved near that
+        day. Intervals and counts are not checked here, so recurring
+        candidates still need expanding to confirm.
+        """
+        weekday = day.weekday()
+        nth = (day.day - 1) // 7 + 1
+        last_day = calendar.monthrange(day.year, day.month)[1]
+        is_last_week = day.day > last_day - 7
+
+        # Dates past the end of a shorter month clamp to its last day.
+        day_of_month = models.Q(anchor_day=day.day)
+        if day.day == last_day:
+            day_of_month |= models.Q(anchor_day__gt=last_day)
+
+        # A fifth weekday falls back to the fourth in months without one.
+        nth_weekday = models.Q(anchor_nth=nth)
+        if nth == 4 and is_last_week:
+            nth_weekday |= models.Q(anchor_nth=5)
+
+        pattern = (
+            models.Q(recurrence_type='daily') |
+            models.Q(recurrence_type='weekly', weekday_match__gt=0) |
+            models.Q(recurrence_type='weekly', weekday_mask=0, anchor_weekday=weekday) |
+            (models.Q(recurrence_type='monthly', monthly_pattern='date') & day_of_month) |
+            (models.Q(recurrence_type='monthly', monthly_pattern='weekday', anchor_weekday=weekday) & nth_weekday) |
+            (models.Q(recurrence_type='yearly', anchor_month=day.month) & day_of_month)
+        )
+        if is_last_week:
+            pattern |= models.Q(recurrence_type='monthly', monthly_pattern='last_weekday', anchor_weekday=weekday)
+
+        # Series dates are local to their timezone, which can be a day ahead
+        # of the UTC start date.
+        in_series = models.Q(start_datetime__date__lte=day + timedelta(days=1)) & (
+            models.Q(recurrence_end_date__isnull=True) | models.Q(recurrence_end_date__gte=day)
+        )
+        return self.annotate(weekday_match=models.F('weekday_mask').bitand(1 << weekday)).filter(
+            models.Q(start_datetime__date=day) |
+            (~models.Q(recurrence_type='none') & in_series & pattern) |
+            (~models.Q(recurrence_type='none') & self.model.moved_near(day))
+        )
+
+
 class Event(models.Model):
     RECURRENCE_TYPES = [
         ('none', 'No Recurrence'),
@@ -60,19 +160,225 @@ class Event(models.Model):
         ('last_weekday', 'Last Weekday of Month'),
     ], default='date', blank=True)
 
+    # IANA zone whose wall clock the series follows, e.g. a weekly 9:00
+    # meeting stays at 9:00 local time across DST changes.
+    timezone = models.CharField(max_length=64, default='UTC', blank=True)
+
+    # Derived from weekdays and start_datetime in save() so recurrence
+    # patterns can be filtered in SQL.
+    weekday_mask = models.PositiveSmallIntegerField(default=0, db_index=True, editable=False)
+    anchor_day = models.PositiveSmallIntegerField(default=1, editable=False)
+    anchor_weekday = models.PositiveSmallIntegerField(default=0, editable=False)
+    anchor_nth = models.PositiveSmallIntegerField(default=1, editable=False)
+    anchor_month = models.PositiveSmallIntegerField(default=1, editable=False)
+
+    objects = EventQuerySet.as_manager()
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    RECURRENCE_METADATA_FIELDS = ['weekday_mask', 'anchor_day', 'anchor_weekday', 'anchor_nth', 'anchor_month']
+
     class Meta:
         ordering = ['start_datetime']
+        indexes = [
+            models.Index(fields=['recurrence_type', 'anchor_weekday']),
+            models.Index(fields=['recurrence_type', 'anchor_day']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.start_datetime}"
 
+    @staticmethod
+    def weekday_mask_for(weekdays):
+        mask = 0
+        for weekday in weekdays or []:
+            mask |= 1 << int(weekday)
+        return mask
+
+    def local_start(self):
+        """The start in the event's own timezone."""
+        if self.timezone in UTC_KEYS:
+            return self.start_datetime
+        return self.start_datetime.astimezone(get_zone(self.timezone))
+
+    def update_recurrence_metadata(self):
+        local_start = self.local_start()
+        self.weekday_mask = self.weekday_mask_for(self.weekdays)
+        self.anchor_day = local_start.day
+        self.anchor_weekday = local_start.weekday()
+        self.anchor_nth = (local_start.day - 1) // 7 + 1
+        self.anchor_month = local_start.month
+
+    @staticmethod
+    def moved_near(day):
+        """
+        Filter for series with an occurrence overridden to start within a
+        day of ``day``, which covers its date in any timezone.
+        """
+        return models.Q(id__in=EventException.objects.filter(
+            is_cancelled=False, start_datetime__date__range=(day - timedelta(days=1), day + timedelta(days=1))
+        ).values('event_id'))
+
     def clean(self):
         if self.end_datetime <= self.start_datetime:
             raise ValidationError("End time must be after start time")
+        if not is_valid_timezone(self.timezone or 'UTC'):
+            raise ValidationError("Unknown timezone")
 
     def save(self, *args, **kwargs):
         self.clean()
+        self.update_recurrence_metadata()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(self.RECURRENCE_METADATA_FIELDS)
         super().save(*args, **kwargs)
+
+
+class EventException(models.Model):
+    """
+    A change to a single occurrence of a recurring event, identified by its
+    occurrence index within the series. The occurrence is either cancelled
+    or replaced with its own times and title.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='exceptions')
+    occurrence_index = models.PositiveIntegerField()
+    is_cancelled = models.BooleanField(default=False)
+
+    title = models.CharField(max_length=200, blank=True)
+    start_datetime = models.DateTimeField(null=True, blank=True)
+    end_datetime = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['event', 'occurrence_index']
+        unique_together = [('event', 'occurrence_index')]
+
+    def __str__(self):
+        return f"{self.event.title} #{self.occurrence_index}"
+
+    @classmethod
+    def by_event(cls, events):
+        """
+        Load the exceptions of every recurring event in ``events`` with a
+        single query, keyed by event id and then by occurrence index.
+        """
+        recurring_ids = [event.id for event in events if event.recurrence_type != 'none']
+        exceptions = {}
+        if recurring_ids:
+            for exception in cls.objects.filter(event_id__in=recurring_ids):
+                exceptions.setdefault(exception.event_id, {})[exception.occurrence_index] = exception
+        return exceptions
+
+    def clean(self):
+        if (self.start_datetime is None) != (self.end_datetime is None):
+            raise ValidationError("Start and end time must be overridden together")
+        if self.start_datetime and self.end_datetime <= self.start_datetime:
+            raise ValidationError("End time must be after start time")
+
+    def save(self, *args, **kwargs):
+        self.clean()
+        super().save(*args, **kwargs)
+
+
+class EventArchive(models.Model):
+    """
+    An event whose last occurrence is long past, moved out of the ``Event``
+    table by the ``archive_events`` command. It keeps the original id and
+    recurrence columns, so the same range filters apply, and its occurrence
+    exceptions as a JSON list.
+    """
+    EVENT_FIELDS = [
+        'id', 'user_id', 'category_id', 'title', 'description', 'start_datetime', 'end_datetime',
+        'recurrence_type', 'recurrence_interval', 'recurrence_end_date', 'recurrence_count',
+        'weekdays', 'monthly_pattern', 'timezone', 'weekday_mask', 'anchor_day', 'anchor_weekday',
+        'anchor_nth', 'anchor_month', 'created_at', 'updated_at',
+    ]
+    EXCEPTION_FIELDS = ['occurrence_index', 'is_cancelled', 'title', 'start_datetime', 'end_datetime']
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_events')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='archived_events')
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    start_datetime = models.DateTimeField()
+    end_datetime = models.DateTimeField()
+
+    recurrence_type = models.CharField(max_length=20, choices=Event.RECURRENCE_TYPES, default='none')
+    recurrence_interval = models.PositiveIntegerField(default=1)
+    recurrence_end_date = models.DateField(null=True, blank=True)
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True)
+    weekdays = models.JSONField(default=list, blank=True)
+    monthly_pattern = models.CharField(max_length=20, default='date', blank=True)
+    timezone = models.CharField(max_length=64, default='UTC', blank=True)
+
+    weekday_mask = models.PositiveSmallIntegerField(default=0)
+    anchor_day = models.PositiveSmallIntegerField(default=1)
+    anchor_weekday = models.PositiveSmallIntegerField(default=0)
+    anchor_nth = models.PositiveSmallIntegerField(default=1)
+    anchor_month = models.PositiveSmallIntegerField(default=1)
+
+    exceptions = models.JSONField(default=list, blank=True)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    last_occurrence_date = models.DateField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['start_datetime']
+        indexes = [
+            models.Index(fields=['user', 'start_datetime']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.start_datetime} (archived)"
+
+    @staticmethod
+    def moved_near(day):
+        """
+        Filter for archived series that may have an occurrence moved onto
+        ``day``. The exceptions are kept as JSON, so any series with
+        exceptions is kept for expansion to decide.
+        """
+        return ~models.Q(exceptions=[])
+
+    @classmethod
+    def from_event(cls, event, last_occurrence_date):
+        archive = cls(last_occurrence_date=last_occurrence_date)
+        for field in cls.EVENT_FIELDS:
+            setattr(archive, field, getattr(event, field))
+        archive.exceptions = [
+            {
+                field: value.isoformat() if isinstance(value, datetime) else value
+                for field, value in ((field, getattr(exception, field)) for field in cls.EXCEPTION_FIELDS)
+            }
+            for exception in event.exceptions.all()
+        ]
+        return archive
+
+    def to_event(self):
+        """An unsaved ``Event`` equivalent to the archived one."""
+        event = Event()
+        for field in self.EVENT_FIELDS:
+            setattr(event, field, getattr(self, field))
+        for relation in ('user', 'category'):
+            if relation in self._state.fields_cache:
+                setattr(event, relation, getattr(self, relation))
+        return event
+
+    def to_exceptions(self):
+        """The archived exceptions as unsaved ``EventException`` objects keyed by occurrence index."""
+        exceptions = {}
+        for data in self.exceptions:
+            exception = EventException(event_id=self.id, **data)
+            for field in ('start_datetime', 'end_datetime'):
+                if data[field]:
+                    setattr(exception, field, datetime.fromisoformat(data[field]))
+            exceptions[exception.occurrence_index] = exception
+        return exceptions
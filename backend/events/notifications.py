@@ -0,0 +1,133 @@
+"""
+Per-user fan-out of event change notifications.
+
+Changes are published to the hub, which hands them to its backend. The
+default backend delivers straight back to this process's subscribers; a
+backend for multi-worker deployments publishes to a shared broker instead
+and calls ``ChangeHub.deliver`` in every worker when a message arrives.
+"""
+import asyncio
+import logging
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """A bounded queue of changes for one connected client."""
+
+    def __init__(self, user_id, loop, max_pending=100):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(max_pending)
+        # Set when changes were dropped; the client should refetch everything.
+        self.overflowed = False
+
+    def put(self, change):
+        if self.queue.full():
+            self.overflowed = True
+        else:
+            self.queue.put_nowait(change)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBackend:
+    """Delivers changes only to clients connected to this process."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, user_id, change):
+        self.hub.deliver(user_id, change)
+
+
+class ChangeHub:
+    def __init__(self, backend_class=InProcessBackend):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self.backend = backend_class(self)
+
+    def subscribe(self, user_id):
+        """Register a subscription on the running event loop."""
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.user_id, None)
+
+    def publish(self, user_id, change):
+        """
+        Hand ``change`` to the backend. Publishing runs after the writer's
+        transaction has committed, so failures are logged, never raised.
+        """
+        try:
+            self.backend.publish(user_id, change)
+        except Exception:
+            logger.exception('Failed to publish event change for user %s', user_id)
+
+    def deliver(self, user_id, change):
+        """Queue ``change`` for this process's subscribers of ``user_id``."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            # A loop that closed without unsubscribing (e.g. a stream served
+            # under WSGI) can no longer receive anything.
+            if subscription.loop.is_closed():
+                self.unsubscribe(subscription)
+                continue
+            try:
+                # Publishers run on request threads; queues belong to the loop.
+                subscription.loop.call_soon_threadsafe(subscription.put, change)
+            except RuntimeError:
+                # The loop closed between the check and the call.
+                self.unsubscribe(subscription)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                backend = getattr(settings, 'EVENT_CHANGE_BACKEND', 'events.notifications.InProcessBackend')
+                _hub = ChangeHub(import_string(backend))
+    return _hub
+
+
+def event_change(event, action):
+    """Build the notification payload for a created, updated, deleted or archived event."""
+    if event.recurrence_type == 'none':
+        end_date = event.end_datetime.date()
+    else:
+        # Open-ended series affect every date from their start onwards.
+        end_date = event.recurrence_end_date
+    return {
+        'action': action,
+        'event_id': event.pk,
+        'updated_at': event.updated_at.isoformat() if event.updated_at else None,
+        'start_date': event.start_datetime.date().isoformat(),
+        'end_date': end_date.isoformat() if end_date else None,
+    }
+
+
+def merge_spans(change, previous):
+    """Widen ``change`` to also cover the date span in ``previous``."""
+    change['start_date'] = min(change['start_date'], previous['start_date'])
+    if change['end_date'] is not None:
+        change['end_date'] = None if previous['end_date'] is None else max(change['end_date'], previous['end_date'])
+    return change
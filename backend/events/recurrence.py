@@ -2,60 +2,213 @@ from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
 import calendar
 
+from .timezones import UTC_KEYS, WallClock, get_zone
+
 
 class RecurrenceGenerator:
-    def __init__(self, event):
+    def __init__(self, event, exceptions=None):
         self.event = event
+        # EventException rows for this series keyed by occurrence_index.
+        self.exceptions = exceptions or {}
+        
+        # Series outside UTC are stepped in naive local wall time so they keep
+        # their clock time across DST changes, then converted back to UTC.
+        if event.timezone in UTC_KEYS:
+            self.zone = self.clock = None
+            self.start = event.start_datetime
+            self.duration = event.end_datetime - event.start_datetime
+        else:
+            self.zone = get_zone(event.timezone)
+            self.clock = WallClock(event.timezone)
+            self.start = event.start_datetime.astimezone(self.zone).replace(tzinfo=None)
+            self.duration = event.end_datetime.astimezone(self.zone).replace(tzinfo=None) - self.start
     
     def generate_occurrences(self, start_date=None, end_date=None, max_count=100):
         if self.event.recurrence_type == 'none':
             return [self.event]
         
         occurrences = []
-        current_date = self.event.start_datetime
+        current_date = self.start
+        index = 0
         
         if start_date and current_date.date() < start_date:
-            current_date = self._find_next_occurrence_after(start_date)
+            current_date, index = self._find_next_occurrence_after(start_date)
         
-        count = 0
-        while count < max_count:
-            if self.event.recurrence_count and count >= self.event.recurrence_count:
+        first_index = index
+        series_ended = False
+        duration = self.duration
+        while current_date and len(occurrences) < max_count:
+            if self.event.recurrence_count and index >= self.event.recurrence_count:
+                series_ended = True
                 break
             
             if self.event.recurrence_end_date and current_date.date() > self.event.recurrence_end_date:
+                series_ended = True
                 break
             
             if end_date and current_date.date() > end_date:
                 break
             
-            if not start_date or current_date.date() >= start_date:
-                duration = self.event.end_datetime - self.event.start_datetime
-                occurrence = {
-                    'id': f"{self.event.id}_{count}",
-                    'event_id': self.event.id,
-                    'title': self.event.title,
-                    'description': self.event.description,
-                    'start_datetime': current_date,
-                    'end_datetime': current_date + duration,
-                    'is_recurring': True,
-                    'occurrence_index': count
-                }
-                occurrences.append(occurrence)
+            exception = self.exceptions.get(index)
+            if exception is None:
+                if self._in_window(current_date.date(), start_date, end_date):
+                    occurrences.append(self._build_occurrence(
+                        index, self._to_utc(current_date), self._to_utc(current_date + duration)
+                    ))
+            elif not exception.is_cancelled:
+                occurrence = self._build_occurrence(
+                    index, self._to_utc(current_date), self._to_utc(current_date + duration), exception
+                )
+                if self._in_window(self._local_date(occurrence['start_datetime']), start_date, end_date):
+                    occurrences.append(occurrence)
             
             current_date = self._get_next_occurrence(current_date)
-            if not current_date:
-                break
-            
-            count += 1
+            index += 1
+        
+        if current_date is None:
+            series_ended = True
+        
+        # Overridden occurrences that were moved into the window from a part
+        # of the series the loop above never visited.
+        for exception_index, exception in self.exceptions.items():
+            if first_index <= exception_index < index:
+                continue
+            if exception_index >= index and series_ended:
+                continue
+            if exception.is_cancelled or exception.start_datetime is None:
+                continue
+            # The loop may have stopped at the window or the limit before
+            # reaching the series end, so check the index against it.
+            if exception_index >= index and not self.has_occurrence(exception_index):
+                continue
+            if self._in_window(self._local_date(exception.start_datetime), start_date, end_date):
+                occurrences.append(self._build_occurrence(
+                    exception_index, exception.start_datetime, exception.end_datetime, exception
+                ))
         
         return occurrences
     
+    def estimate_count(self, start_date, end_date):
+        """
+        Estimate, from the recurrence parameters alone, how many occurrences
+        fall between ``start_date`` and ``end_date``. Errs high so callers
+        can budget before expanding.
+        """
+        event = self.event
+        if event.recurrence_type == 'none':
+            return 1 if start_date <= event.start_datetime.date() <= end_date else 0
+        
+        first = max(start_date, self.start.date())
+        last = end_date
+        if event.recurrence_end_date:
+            last = min(last, event.recurrence_end_date)
+        
+        # Overrides can move occurrences in from outside the range.
+        moved = len([e for e in self.exceptions.values() if e.start_datetime is not None])
+        if last < first:
+            return moved
+        
+        interval = event.recurrence_interval or 1
+        days = (last - first).days + 1
+        if event.recurrence_type == 'daily':
+            estimate = days // interval + 1
+        elif event.recurrence_type == 'weekly':
+            per_week = bin(event.weekday_mask).count('1') or 1
+            estimate = (days // (7 * interval) + 1) * per_week + 1
+        elif event.recurrence_type == 'monthly':
+            months = (last.year - first.year) * 12 + last.month - first.month
+            estimate = months // interval + 1
+        elif event.recurrence_type == 'yearly':
+            estimate = (last.year - first.year) // interval + 1
+        else:
+            estimate = 1
+        
+        if event.recurrence_count:
+            estimate = min(estimate, event.recurrence_count)
+        return estimate + moved
+    
+    def occurrence_total(self):
+        """The number of occurrences in the series, or None if it never ends."""
+        event = self.event
+        if event.recurrence_type == 'none':
+            return 1
+        
+        totals = []
+        if event.recurrence_count:
+            totals.append(event.recurrence_count)
+        if event.recurrence_end_date:
+            # The first occurrence after the end date is numbered the total.
+            current, index = self._find_next_occurrence_after(event.recurrence_end_date + timedelta(days=1))
+            totals.append(index + 1 if current is None else index)
+        elif event.recurrence_type not in ('daily', 'weekly', 'monthly', 'yearly'):
+            # Custom patterns never step past their start.
+            totals.append(1)
+        return min(totals) if totals else None
+    
+    def has_occurrence(self, index):
+        """Whether the series reaches occurrence ``index``."""
+        if not hasattr(self, '_total'):
+            self._total = self.occurrence_total()
+        return self._total is None or index < self._total
+    
+    def last_occurrence_date(self):
+        """
+        The date the series' final occurrence ends (erring late), or None if
+        the series never ends.
+        """
+        event = self.event
+        if event.recurrence_type == 'none':
+            return event.end_datetime.date()
+        
+        if event.recurrence_end_date:
+            last = event.recurrence_end_date + timedelta(days=self.duration.days + 1)
+        elif event.recurrence_count:
+            occurrences = self.generate_occurrences(None, None, event.recurrence_count)
+            if not occurrences:
+                return event.end_datetime.date()
+            last = max(occurrence['end_datetime'] for occurrence in occurrences).date()
+        else:
+            return None
+        
+        moved = [e.end_datetime.date() for e in self.exceptions.values() if e.end_datetime is not None]
+        return max([last] + moved)
+    
+    def _build_occurrence(self, index, start_datetime, end_datetime, exception=None):
+        title = self.event.title
+        if exception is not None:
+            title = exception.title or title
+            if exception.start_datetime is not None:
+                start_datetime = exception.start_datetime
+                end_datetime = exception.end_datetime
+        
+        return {
+            'id': f"{self.event.id}_{index}",
+            'event_id': self.event.id,
+            'title': title,
+            'description': self.event.description,
+            'start_datetime': start_datetime,
+            'end_datetime': end_datetime,
+            'is_recurring': True,
+            'occurrence_index': index
+        }
+    
+    def _to_utc(self, moment):
+        return moment if self.clock is None else self.clock.to_utc(moment)
+    
+    def _local_date(self, moment):
+        """The date of an aware datetime in the series' timezone."""
+        return moment.date() if self.zone is None else moment.astimezone(self.zone).date()
+    
+    @staticmethod
+    def _in_window(day, start_date, end_date):
+        return (not start_date or day >= start_date) and (not end_date or day <= end_date)
+    
     def _get_next_occurrence(self, current_date):
         if self.event.recurrence_type == 'daily':
             return current_date + timedelta(days=self.event.recurrence_interval)
         
         elif self.event.recurrence_type == 'weekly':
-            if self.event.weekdays:
+            if self.event.weekday_mask:
                 return self._get_next_weekday_occurrence(current_date)
             else:
                 return current_date + timedelta(weeks=self.event.recurrence_interval)
@@ -69,20 +222,17 @@ class RecurrenceGenerator:
         return None
     
     def _get_next_weekday_occurrence(self, current_date):
-        weekdays = sorted(self.event.weekdays)
+        mask = self.event.weekday_mask
         current_weekday = current_date.weekday()
         
-        next_weekday = None
-        for wd in weekdays:
-            if wd > current_weekday:
-                next_weekday = wd
-                break
-        
-        if next_weekday is not None:
-            days_ahead = next_weekday - current_weekday
+        # Bits for the weekdays after the current one, lowest first.
+        later = mask >> (current_weekday + 1)
+        if later:
+            days_ahead = (later & -later).bit_length()
             return current_date + timedelta(days=days_ahead)
         else:
-            days_ahead = (7 - current_weekday) + weekdays[0]
+            first_weekday = (mask & -mask).bit_length() - 1
+            days_ahead = (7 - current_weekday) + first_weekday
             if self.event.recurrence_interval > 1:
                 days_ahead += (self.event.recurrence_interval - 1) * 7
             return current_date + timedelta(days=days_ahead)
@@ -91,11 +241,11 @@ class RecurrenceGenerator:
         if self.event.monthly_pattern == 'date':
             try:
                 next_month = current_date + relativedelta(months=self.event.recurrence_interval)
-                return next_month.replace(day=self.event.start_datetime.day)
+                return next_month.replace(day=self.start.day)
             except ValueError:
                 next_month = current_date + relativedelta(months=self.event.recurrence_interval)
                 last_day = calendar.monthrange(next_month.year, next_month.month)[1]
-                return next_month.replace(day=min(self.event.start_datetime.day, last_day))
+                return next_month.replace(day=min(self.start.day, last_day))
         
         elif self.event.monthly_pattern == 'weekday':
             return self._get_nth_weekday_of_month(current_date)
@@ -106,10 +256,10 @@ class RecurrenceGenerator:
         return current_date + relativedelta(months=self.event.recurrence_interval)
     
     def _get_nth_weekday_of_month(self, current_date):
-        start_date = self.event.start_datetime
-        weekday = start_date.weekday()
+        start_date = self.start
+        weekday = self.event.anchor_weekday
         
-        week_of_month = (start_date.day - 1) // 7 + 1
+        week_of_month = self.event.anchor_nth
         
         next_month = current_date + relativedelta(months=self.event.recurrence_interval)
         first_day = next_month.replace(day=1)
@@ -129,8 +279,8 @@ class RecurrenceGenerator:
         )
     
     def _get_last_weekday_of_month(self, current_date):
-        start_date = self.event.start_datetime
-        weekday = start_date.weekday()
+        start_date = self.start
+        weekday = self.event.anchor_weekday
         
         next_month = current_date + relativedelta(months=self.event.recurrence_interval)
         last_day = calendar.monthrange(next_month.year, next_month.month)[1]
@@ -147,9 +297,65 @@ class RecurrenceGenerator:
         )
     
     def _find_next_occurrence_after(self, target_date):
-        current = self.event.start_datetime
+        """
+        Return the first occurrence on or after ``target_date`` together with
+        its index in the series, so skipped occurrences keep their numbering.
+        """
+        current, index = self._occurrence_before(target_date)
         while current.date() < target_date:
             current = self._get_next_occurrence(current)
             if not current:
                 break
-        return current
+            index += 1
+        return current, index
+    
+    def _occurrence_before(self, target_date):
+        """
+        Jump straight to an occurrence no later than the first one on or after
+        ``target_date``, computed from the recurrence parameters instead of
+        stepping through the series from its start.
+        """
+        start = self.start
+        interval = self.event.recurrence_interval or 1
+        recurrence_type = self.event.recurrence_type
+        
+        if target_date <= start.date():
+            return start, 0
+        
+        if recurrence_type == 'daily' or (recurrence_type == 'weekly' and not self.event.weekday_mask):
+            step_days = interval if recurrence_type == 'daily' else interval * 7
+            index = (target_date - start.date()).days // step_days
+            return start + timedelta(days=index * step_days), index
+        
+        if recurrence_type == 'weekly':
+            weekdays = [wd for wd in range(7) if self.event.weekday_mask & (1 << wd)]
+            period_days = interval * 7
+            week_start = start.date() - timedelta(days=start.weekday())
+            period = (target_date - week_start).days // period_days
+            if period < 1:
+                return start, 0
+            # The first week holds the start plus any later listed weekdays;
+            # every following period holds each listed weekday once.
+            first_week_count = 1 + len([wd for wd in weekdays if wd > start.weekday()])
+            index = first_week_count + (period - 1) * len(weekdays)
+            days = period * period_days - start.weekday() + weekdays[0]
+            return start + timedelta(days=days), index
+        
+        if recurrence_type == 'monthly' and self.event.monthly_pattern in ('date', 'weekday', 'last_weekday'):
+            step_months = interval
+        elif recurrence_type == 'yearly' and not (start.month == 2 and start.day == 29):
+            # A Feb 29 start clamps to Feb 28 and stays there, so it is
+            # left to the step-by-step walk.
+            step_months = interval * 12
+        else:
+            return start, 0
+        
+        months = (target_date.year - start.year) * 12 + target_date.month - start.month
+        index = months // step_months
+        if index < 1:
+            return start, 0
+        
+        if recurrence_type == 'monthly' and self.event.monthly_pattern != 'date':
+            previous = start + relativedelta(months=(index - 1) * step_months)
+            return self._get_next_monthly_occurrence(previous), index
+        return start + relativedelta(months=index * step_months), index
@@ -0,0 +1,98 @@
+"""
+Full-text search over event title, description and category name.
+
+PostgreSQL keeps a weighted ``tsvector`` in ``events_event.search_vector``
+behind a GIN index; SQLite keeps an FTS5 table ``events_event_fts`` whose
+rowid is the event id. Both are created by migration 0004; neither is a
+model field, so they are kept in sync here, driven by the signal handlers
+in ``events.signals``.
+"""
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+POSTGRES_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce(events_event.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(events_event.description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(
+        (SELECT name FROM events_category WHERE events_category.id = events_event.category_id), ''
+    )), 'C')
+"""
+
+
+def index_events(event_ids):
+    """Refresh the search index rows of the given events."""
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+
+    placeholders = ', '.join(['%s'] * len(event_ids))
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'UPDATE events_event SET search_vector = {POSTGRES_VECTOR_SQL} '
+                f'WHERE events_event.id IN ({placeholders})',
+                event_ids
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM events_event_fts WHERE rowid IN ({placeholders})', event_ids)
+            cursor.execute(
+                'INSERT INTO events_event_fts (rowid, title, description, category_name) '
+                'SELECT e.id, e.title, e.description, COALESCE(c.name, \'\') '
+                'FROM events_event e LEFT JOIN events_category c ON c.id = e.category_id '
+                f'WHERE e.id IN ({placeholders})',
+                event_ids
+            )
+
+
+def unindex_events(event_ids):
+    """Drop deleted events from the search index."""
+    event_ids = list(event_ids)
+    if not event_ids or connection.vendor != 'sqlite':
+        # On PostgreSQL the vector is deleted along with its row.
+        return
+
+    placeholders = ', '.join(['%s'] * len(event_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM events_event_fts WHERE rowid IN ({placeholders})', event_ids)
+
+
+def _fts5_query(query):
+    # Quote every term so user input can't use FTS5 query syntax; the last
+    # term is matched as a prefix to support search-as-you-type.
+    terms = ['"%s"' % term.replace('"', '""') for term in query.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_events(events, query):
+    """
+    Filter ``events`` to those matching ``query`` and order them by
+    relevance, best match first.
+    """
+    if connection.vendor == 'postgresql':
+        tsquery = "websearch_to_tsquery('english', %s)"
+        return events.filter(
+            id__in=RawSQL(f'SELECT id FROM events_event WHERE search_vector @@ {tsquery}', (query,))
+        ).annotate(
+            rank=RawSQL(f'ts_rank(events_event.search_vector, {tsquery})', (query,))
+        ).order_by('-rank', 'start_datetime')
+
+    if connection.vendor == 'sqlite':
+        match = _fts5_query(query)
+        # bm25() is lower for better matches.
+        return events.filter(
+            id__in=RawSQL('SELECT rowid FROM events_event_fts WHERE events_event_fts MATCH %s', (match,))
+        ).annotate(
+            rank=RawSQL(
+                'SELECT bm25(events_event_fts) FROM events_event_fts '
+                'WHERE events_event_fts MATCH %s AND rowid = events_event.id',
+                (match,)
+            )
+        ).order_by('rank', 'start_datetime')
+
+    return events.filter(
+        Q(title__icontains=query) | Q(description__icontains=query) | Q(category__name__icontains=query)
+    )
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Event, Category
+from .models import Event, EventException, Category
+from .recurrence import RecurrenceGenerator
+from .timezones import is_valid_timezone
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -16,6 +18,20 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class CategoryStatsSerializer(CategorySerializer):
+    event_count = serializers.SerializerMethodField()
+    upcoming_count = serializers.SerializerMethodField()
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ['event_count', 'upcoming_count']
+
+    def get_event_count(self, category):
+        return self.context['stats'].get(category.id, {}).get('event_count', 0)
+
+    def get_upcoming_count(self, category):
+        return self.context['stats'].get(category.id, {}).get('upcoming_count', 0)
+
+
 class EventSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
@@ -25,10 +41,15 @@ class EventSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user', 'category', 'title', 'description', 'start_datetime', 'end_datetime',
             'recurrence_type', 'recurrence_interval', 'recurrence_end_date',
-            'recurrence_count', 'weekdays', 'monthly_pattern', 'created_at', 'updated_at'
+            'recurrence_count', 'weekdays', 'monthly_pattern', 'timezone', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
     
+    def validate_timezone(self, value):
+        if value and not is_valid_timezone(value):
+            raise serializers.ValidationError("Unknown timezone")
+        return value
+
     def validate(self, data):
         if data['end_datetime'] <= data['start_datetime']:
             raise serializers.ValidationError("End time must be after start time")
@@ -46,9 +67,14 @@ class EventCreateSerializer(serializers.ModelSerializer):
         fields = [
             'category', 'title', 'description', 'start_datetime', 'end_datetime',
             'recurrence_type', 'recurrence_interval', 'recurrence_end_date',
-            'recurrence_count', 'weekdays', 'monthly_pattern'
+            'recurrence_count', 'weekdays', 'monthly_pattern', 'timezone'
         ]
     
+    def validate_timezone(self, value):
+        if value and not is_valid_timezone(value):
+            raise serializers.ValidationError("Unknown timezone")
+        return value
+
     def validate(self, data):
         if data['end_datetime'] <= data['start_datetime']:
             raise serializers.ValidationError("End time must be after start time")
@@ -66,11 +92,54 @@ class EventUpdateSerializer(serializers.ModelSerializer):
         fields = [
             'category', 'title', 'description', 'start_datetime', 'end_datetime',
             'recurrence_type', 'recurrence_interval', 'recurrence_end_date',
-            'recurrence_count', 'weekdays', 'monthly_pattern'
+            'recurrence_count', 'weekdays', 'monthly_pattern', 'timezone'
         ]
     
+    def validate_timezone(self, value):
+        if value and not is_valid_timezone(value):
+            raise serializers.ValidationError("Unknown timezone")
+        return value
+
     def validate(self, data):
         if data['end_datetime'] <= data['start_datetime']:
             raise serializers.ValidationError("End time must be after start time")
 
         return data
+
+
+class EventExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventException
+        fields = [
+            'id', 'occurrence_index', 'is_cancelled', 'title', 'start_datetime', 'end_datetime',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate(self, data):
+        event = self.context['event']
+        if event.recurrence_type == 'none':
+            raise serializers.ValidationError("Only recurring events can have exceptions")
+
+        occurrence_index = data.get('occurrence_index', getattr(self.instance, 'occurrence_index', None))
+        if not RecurrenceGenerator(event).has_occurrence(occurrence_index):
+            raise serializers.ValidationError("Occurrence index is past the end of the series")
+
+        duplicates = EventException.objects.filter(event=event, occurrence_index=occurrence_index)
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError("This occurrence already has an exception")
+
+        start_datetime = data.get('start_datetime', getattr(self.instance, 'start_datetime', None))
+        end_datetime = data.get('end_datetime', getattr(self.instance, 'end_datetime', None))
+        if (start_datetime is None) != (end_datetime is None):
+            raise serializers.ValidationError("Start and end time must be overridden together")
+        if start_datetime and end_datetime <= start_datetime:
+            raise serializers.ValidationError("End time must be after start time")
+
+        return data
+
+    def create(self, validated_data):
+        validated_data['event'] = self.context['event']
+        return super().create(validated_data)
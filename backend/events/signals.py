@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import search, stats
+from .models import Category, Event, EventException
+from .notifications import event_change, get_hub, merge_spans
+
+
+_archiving = ContextVar('archiving', default=False)
+
+
+@contextmanager
+def archiving():
+    """Report events deleted inside the block as archived rather than deleted."""
+    token = _archiving.set(True)
+    try:
+        yield
+    finally:
+        _archiving.reset(token)
+
+
+def _publish(user_id, change):
+    transaction.on_commit(lambda: get_hub().publish(user_id, change))
+
+
+def _deleting_series(origin):
+    """Whether a delete started from events, which cascade to their exceptions."""
+    if isinstance(origin, QuerySet):
+        return origin.model is Event
+    return isinstance(origin, Event)
+
+
+@receiver(post_save, sender=Event)
+def index_saved_event(sender, instance, **kwargs):
+    search.index_events([instance.pk])
+
+
+@receiver(post_delete, sender=Event)
+def unindex_deleted_event(sender, instance, **kwargs):
+    search.unindex_events([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_events(sender, instance, created, **kwargs):
+    if not created:
+        search.index_events(instance.events.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_events(sender, instance, **kwargs):
+    # The SET_NULL cascade is a bulk update that sends no Event signals.
+    instance._search_event_ids = list(instance.events.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def reindex_uncategorized_events(sender, instance, **kwargs):
+    search.index_events(getattr(instance, '_search_event_ids', []))
+
+
+@receiver(pre_save, sender=Event)
+def remember_previous_span(sender, instance, raw=False, **kwargs):
+    instance._previous_change = None
+    if instance.pk and not raw:
+        previous = Event.objects.filter(pk=instance.pk).only(
+            'start_datetime', 'end_datetime', 'recurrence_type', 'recurrence_end_date', 'updated_at'
+        ).first()
+        if previous is not None:
+            instance._previous_change = event_change(previous, 'updated')
+
+
+@receiver(post_save, sender=Event)
+def publish_saved_event(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    change = event_change(instance, 'created' if created else 'updated')
+    if getattr(instance, '_previous_change', None):
+        # A moved event must also refresh the dates it moved away from.
+        change = merge_spans(change, instance._previous_change)
+    _publish(instance.user_id, change)
+
+
+@receiver(post_delete, sender=Event)
+def publish_deleted_event(sender, instance, **kwargs):
+    action = 'archived' if _archiving.get() else 'deleted'
+    _publish(instance.user_id, event_change(instance, action))
+
+
+@receiver(post_save, sender=EventException)
+@receiver(post_delete, sender=EventException)
+def publish_changed_exception(sender, instance, raw=False, origin=None, **kwargs):
+    # The series' own delete notification covers its exceptions.
+    if raw or _deleting_series(origin):
+        return
+    # Look the series up rather than follow the relation; it may be gone.
+    event = Event.objects.filter(pk=instance.event_id).first()
+    if event is not None:
+        _publish(event.user_id, event_change(event, 'updated'))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_category_stats(sender, instance, **kwargs):
+    stats.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=EventException)
+@receiver(post_delete, sender=EventException)
+def invalidate_category_stats_for_exception(sender, instance, origin=None, **kwargs):
+    if _deleting_series(origin):
+        return
+    user_id = Event.objects.filter(pk=instance.event_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        stats.invalidate(user_id)
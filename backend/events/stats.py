@@ -0,0 +1,59 @@
+"""
+Per-user usage statistics for categories, cached until one of the user's
+events changes (see ``events.signals``).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Event, EventException
+from .recurrence import RecurrenceGenerator
+
+
+def cache_key(user_id):
+    return f'category_stats:{user_id}'
+
+
+def invalidate(user_id):
+    cache.delete(cache_key(user_id))
+
+
+def category_stats(user):
+    """
+    ``{category_id: {'event_count': ..., 'upcoming_count': ...}}`` for the
+    user's events, where ``upcoming_count`` counts occurrences in the next
+    ``CATEGORY_UPCOMING_DAYS`` days.
+    """
+    key = cache_key(user.id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = _compute(user)
+        cache.set(key, stats, settings.CATEGORY_STATS_CACHE_TTL)
+    return stats
+
+
+def _compute(user):
+    events = Event.objects.filter(user=user, category__isnull=False)
+    stats = {
+        row['category']: {'event_count': row['event_count'], 'upcoming_count': 0}
+        for row in events.values('category').annotate(event_count=Count('id')).order_by()
+    }
+
+    today = timezone.now().date()
+    end_date = today + timedelta(days=settings.CATEGORY_UPCOMING_DAYS)
+    upcoming = list(events.in_range(today, end_date))
+
+    exceptions = EventException.by_event(upcoming)
+
+    for event in upcoming:
+        if event.recurrence_type == 'none':
+            count = 1
+        else:
+            generator = RecurrenceGenerator(event, exceptions.get(event.id))
+            count = len(generator.generate_occurrences(today, end_date, settings.MAX_OCCURRENCES_PER_REQUEST))
+        stats[event.category_id]['upcoming_count'] += count
+
+    return stats
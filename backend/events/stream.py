@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from authentication.authentication import CachedJWTAuthentication
+from .notifications import get_hub
+
+
+def _authenticate(request):
+    """
+    Authenticate with the usual bearer header or, since browsers'
+    EventSource cannot send headers, a ``token`` query parameter.
+    """
+    authentication = CachedJWTAuthentication()
+    try:
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header else request.GET.get('token')
+        if not raw_token:
+            return None
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except AuthenticationFailed:
+        return None
+
+
+def _message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def event_changes(request):
+    """
+    Server-sent events stream of the user's event changes. Each ``change``
+    message carries the event id, its ``updated_at`` and the affected date
+    span so clients refetch only when and where something changed. Needs an
+    ASGI server: WSGI servers consume the whole response before sending it,
+    so under WSGI the view answers 501 instead of subscribing.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The event stream requires an ASGI server'}, status=501)
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided'}, status=401)
+
+    hub = get_hub()
+    subscription = hub.subscribe(user.id)
+    keepalive = settings.EVENT_STREAM_KEEPALIVE
+
+    async def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    yield _message('resync', {})
+                try:
+                    change = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield _message('change', change)
+        finally:
+            hub.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
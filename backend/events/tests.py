@@ -1,3 +1,409 @@
+import random
+from io import StringIO
+from unittest import mock
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Category, Event, EventArchive, EventException
+from .recurrence import RecurrenceGenerator
+from .views import _decode_cursor, _encode_cursor
+
+
+def _series(**fields):
+    event = Event(**fields)
+    event.update_recurrence_metadata()
+    return event
+
+
+class OccurrenceSeekTests(TestCase):
+    def step_walk(self, generator, target_date):
+        """The first occurrence on or after ``target_date`` found by walking from the start."""
+        current, index = generator.start, 0
+        while current is not None and current.date() < target_date:
+            current = generator._get_next_occurrence(current)
+            index += 1
+        return current, index
+
+    def random_series(self, rng):
+        recurrence_type = rng.choice(['daily', 'weekly', 'weekly', 'monthly', 'yearly'])
+        start = datetime(
+            rng.randint(2020, 2026), rng.randint(1, 12), rng.randint(1, 28),
+            rng.randint(0, 23), rng.choice([0, 30]), tzinfo=dt_timezone.utc
+        )
+        if rng.random() < 0.1:
+            start = start.replace(month=rng.choice([1, 3, 5]), day=rng.choice([29, 30, 31]))
+        weekdays = []
+        if recurrence_type == 'weekly' and rng.random() < 0.7:
+            weekdays = sorted(rng.sample(range(7), rng.randint(1, 4)))
+        return _series(
+            title='Series', start_datetime=start, end_datetime=start + timedelta(hours=1),
+            recurrence_type=recurrence_type, recurrence_interval=rng.randint(1, 3),
+            weekdays=weekdays, monthly_pattern=rng.choice(['date', 'weekday', 'last_weekday']),
+            timezone=rng.choice(['UTC', 'Europe/Paris', 'America/New_York', 'Australia/Sydney']),
+        )
+
+    def test_jump_ahead_matches_step_walk(self):
+        rng = random.Random(360)
+        for _ in range(400):
+            event = self.random_series(rng)
+            generator = RecurrenceGenerator(event)
+            target_date = generator.start.date() + timedelta(days=rng.randint(0, 4 * 366))
+            with self.subTest(
+                recurrence_type=event.recurrence_type, start=event.start_datetime,
+                interval=event.recurrence_interval, weekdays=event.weekdays,
+                monthly_pattern=event.monthly_pattern, timezone=event.timezone, target_date=target_date,
+            ):
+                self.assertEqual(
+                    generator._find_next_occurrence_after(target_date),
+                    self.step_walk(generator, target_date)
+                )
+
+
+class OccurrenceFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('feed', 'feed@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.base = datetime(2030, 1, 1, 9, 0, tzinfo=dt_timezone.utc)
+
+    def create_event(self, start, **fields):
+        return Event.objects.create(
+            user=self.user, title='Event', start_datetime=start, end_datetime=start + timedelta(hours=1), **fields
+        )
+
+    def read_feed(self, page_size):
+        keys = []
+        url = f'/api/events/feed/?start={self.base.isoformat()}&page_size={page_size}'.replace('+', '%2B')
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            keys.extend(
+                (occurrence['start_datetime'], occurrence['event_id'], occurrence['occurrence_index'])
+                for occurrence in response.data['results']
+            )
+            url = response.data['next']
+        return keys
+
+    def test_cursor_round_trip(self):
+        occurrence = {'start_datetime': self.base, 'event_id': 7, 'occurrence_index': 12}
+        self.assertEqual(_decode_cursor(_encode_cursor(occurrence)), (self.base, 7, 12))
+        self.assertIsNone(_decode_cursor('not a cursor'))
+
+    def test_pages_cover_every_one_off_event(self):
+        events = [self.create_event(self.base + timedelta(hours=hour)) for hour in range(120)]
+
+        keys = self.read_feed(page_size=50)
+
+        self.assertEqual([event_id for _, event_id, _ in keys], [event.id for event in events])
+
+    def test_pages_match_full_expansion(self):
+        for day in range(40):
+            # Several one-offs share a start so ties are ordered by id.
+            self.create_event(self.base + timedelta(days=day // 2))
+        daily = self.create_event(self.base, recurrence_type='daily', recurrence_count=60)
+        weekly = self.create_event(
+            self.base, recurrence_type='weekly', weekdays=[0, 2, 4], recurrence_count=30, timezone='Europe/Paris'
+        )
+        EventException.objects.create(event=daily, occurrence_index=3, is_cancelled=True)
+        # Moved far ahead and back before most of the series.
+        EventException.objects.create(
+            event=daily, occurrence_index=5,
+            start_datetime=self.base + timedelta(days=90), end_datetime=self.base + timedelta(days=90, hours=1)
+        )
+        EventException.objects.create(
+            event=weekly, occurrence_index=20,
+            start_datetime=self.base + timedelta(hours=1), end_datetime=self.base + timedelta(hours=2)
+        )
+
+        expected = []
+        for event in Event.objects.filter(user=self.user):
+            exceptions = {exception.occurrence_index: exception for exception in event.exceptions.all()}
+            for occurrence in RecurrenceGenerator(event, exceptions).generate_occurrences(
+                date(2029, 12, 31), None, 1000
+            ):
+                if isinstance(occurrence, Event):
+                    expected.append((occurrence.start_datetime, occurrence.id, 0))
+                else:
+                    expected.append(
+                        (occurrence['start_datetime'], occurrence['event_id'], occurrence['occurrence_index'])
+                    )
+        expected = sorted(key for key in expected if key[0] >= self.base)
+
+        for page_size in (1, 7, 50):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.read_feed(page_size), expected)
+
+
+class CalendarBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('batch', 'batch@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        start = datetime(2030, 1, 1, 9, 0, tzinfo=dt_timezone.utc)
+        for _ in range(10):
+            Event.objects.create(
+                user=self.user, title='Daily', start_datetime=start, end_datetime=start + timedelta(hours=1),
+                recurrence_type='daily'
+            )
+
+    def test_far_apart_windows_are_expanded_separately(self):
+        response = self.client.get(
+            '/api/events/calendar/batch/?windows=2030-01-01:2030-01-31,2030-12-01:2030-12-31'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['truncated'])
+        self.assertEqual([len(window['occurrences']) for window in response.data['windows']], [310, 310])
+
+    def test_prefetch_is_capped_to_the_window_limit(self):
+        url = '/api/events/calendar/batch/?start_date=2030-03-01&end_date=2030-03-07&prefetch='
+
+        response = self.client.get(url + '5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['windows']), 11)
+
+        response = self.client.get(url + '6')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('between 0 and 5', response.data['error'])
+
+    def test_windows_group_series_on_their_local_date(self):
+        # 00:30 on the 1st in Paris is the last day of the previous month in UTC.
+        start = datetime(2030, 2, 28, 23, 30, tzinfo=dt_timezone.utc)
+        Event.objects.filter(user=self.user).delete()
+        Event.objects.create(
+            user=self.user, title='Monthly', start_datetime=start, end_datetime=start + timedelta(hours=1),
+            recurrence_type='monthly', timezone='Europe/Paris'
+        )
+
+        calendar = self.client.get('/api/events/calendar/?start_date=2030-03-01&end_date=2030-03-31')
+        batch = self.client.get('/api/events/calendar/batch/?windows=2030-02-01:2030-02-28,2030-03-01:2030-03-31')
+
+        self.assertEqual(len(calendar.data), 1)
+        self.assertEqual([len(window['occurrences']) for window in batch.data['windows']], [0, 1])
+
+
+class EventQuerySetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('query', 'query@example.com', 'password')
+        start = datetime(2030, 3, 4, 9, 0, tzinfo=dt_timezone.utc)  # A Monday.
+        self.weekly = Event.objects.create(
+            user=self.user, title='Weekly', start_datetime=start, end_datetime=start + timedelta(hours=1),
+            recurrence_type='weekly'
+        )
+        self.one_off = Event.objects.create(
+            user=self.user, title='One-off', start_datetime=start, end_datetime=start + timedelta(hours=1),
+            weekdays=[2]
+        )
+
+    def test_single_day_keeps_series_with_an_occurrence_moved_onto_it(self):
+        moved = datetime(2030, 3, 13, 9, 0, tzinfo=dt_timezone.utc)  # A Wednesday.
+        EventException.objects.create(
+            event=self.weekly, occurrence_index=1, start_datetime=moved, end_datetime=moved + timedelta(hours=1)
+        )
+        day = date(2030, 3, 13)
+
+        self.assertIn(self.weekly, Event.objects.in_range(day, day))
+        self.assertNotIn(self.weekly, Event.objects.in_range(date(2030, 3, 15), date(2030, 3, 15)))
+
+    def test_weekday_mask_only_applies_to_weekly_series(self):
+        self.assertNotIn(self.one_off, Event.objects.on_weekday(2))
+        self.assertIn(self.one_off, Event.objects.on_weekday(0))
+
+    def test_weekday_matches_custom_events_on_their_start_weekday(self):
+        custom = Event.objects.create(
+            user=self.user, title='Custom', start_datetime=self.weekly.start_datetime,
+            end_datetime=self.weekly.end_datetime, recurrence_type='custom'
+        )
+
+        self.assertIn(custom, Event.objects.on_weekday(0))
+        self.assertNotIn(custom, Event.objects.on_weekday(1))
+
+    def test_weekday_matches_daily_series_stepping_whole_weeks_on_their_start_weekday(self):
+        fortnightly = Event.objects.create(
+            user=self.user, title='Fortnightly', start_datetime=self.weekly.start_datetime,
+            end_datetime=self.weekly.end_datetime, recurrence_type='daily', recurrence_interval=14
+        )
+        every_other_day = Event.objects.create(
+            user=self.user, title='Every other day', start_datetime=self.weekly.start_datetime,
+            end_datetime=self.weekly.end_datetime, recurrence_type='daily', recurrence_interval=2
+        )
+
+        self.assertIn(fortnightly, Event.objects.on_weekday(0))
+        self.assertNotIn(fortnightly, Event.objects.on_weekday(3))
+        self.assertIn(every_other_day, Event.objects.on_weekday(3))
+
+    def test_single_day_matches_yearly_series_by_local_date(self):
+        # 00:30 on January 1 in Paris is still December 31 in UTC.
+        start = datetime(2029, 12, 31, 23, 30, tzinfo=dt_timezone.utc)
+        yearly = Event.objects.create(
+            user=self.user, title='New year', start_datetime=start, end_datetime=start + timedelta(hours=1),
+            recurrence_type='yearly', timezone='Europe/Paris'
+        )
+        day = date(2031, 1, 1)
+
+        self.assertIn(yearly, Event.objects.in_range(day, day))
+
+
+class EventExceptionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('exceptions', 'exceptions@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.start = datetime(2030, 1, 1, 9, 0, tzinfo=dt_timezone.utc)
+        self.series = Event.objects.create(
+            user=self.user, title='Daily', start_datetime=self.start, end_datetime=self.start + timedelta(hours=1),
+            recurrence_type='daily', recurrence_end_date=date(2030, 1, 10)
+        )
+
+    def test_index_past_the_end_date_is_rejected(self):
+        url = f'/api/events/{self.series.id}/exceptions/'
+
+        self.assertEqual(self.client.post(url, {'occurrence_index': 9, 'is_cancelled': True}).status_code, 201)
+        self.assertEqual(self.client.post(url, {'occurrence_index': 10, 'is_cancelled': True}).status_code, 400)
+
+    def test_override_past_the_end_is_ignored_in_any_window(self):
+        moved = self.start + timedelta(days=1, hours=3)
+        exception = EventException(
+            event=self.series, occurrence_index=50, start_datetime=moved, end_datetime=moved + timedelta(hours=1)
+        )
+        generator = RecurrenceGenerator(self.series, {50: exception})
+
+        window = generator.generate_occurrences(date(2030, 1, 1), date(2030, 1, 3))
+        unbounded = generator.generate_occurrences()
+
+        self.assertEqual([occurrence['occurrence_index'] for occurrence in window], [0, 1, 2])
+        self.assertEqual([occurrence['occurrence_index'] for occurrence in unbounded], list(range(10)))
+
+
+class EventSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('search', 'search@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name='Gardening')
+        start = datetime(2030, 1, 1, 9, 0, tzinfo=dt_timezone.utc)
+        self.in_description = Event.objects.create(
+            user=self.user, title='Weekly sync', description='Plan the budget review',
+            start_datetime=start, end_datetime=start + timedelta(hours=1)
+        )
+        self.in_title = Event.objects.create(
+            user=self.user, title='Budget review', start_datetime=start + timedelta(days=1),
+            end_datetime=start + timedelta(days=1, hours=1), category=self.category
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/events/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [event['id'] for event in response.data['results']]
+
+    def test_title_matches_rank_above_description_matches(self):
+        self.assertEqual(self.search('budget'), [self.in_title.id, self.in_description.id])
+
+    def test_last_term_matches_as_a_prefix(self):
+        self.assertEqual(self.search('budget rev'), [self.in_title.id, self.in_description.id])
+
+    def test_category_rename_reindexes_its_events(self):
+        self.assertEqual(self.search('gardening'), [self.in_title.id])
+
+        self.category.name = 'Allotment'
+        self.category.save()
+
+        self.assertEqual(self.search('gardening'), [])
+        self.assertEqual(self.search('allotment'), [self.in_title.id])
+
+    def test_category_delete_reindexes_its_events(self):
+        self.category.delete()
+
+        self.assertEqual(self.search('gardening'), [])
+        self.assertEqual(self.search('budget'), [self.in_title.id, self.in_description.id])
+
+
+class EventSignalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('signals', 'signals@example.com', 'password')
+        self.start = datetime(2030, 1, 1, 9, 0, tzinfo=dt_timezone.utc)
+
+    def series_with_exceptions(self, count):
+        series = Event.objects.create(
+            user=self.user, title='Daily', start_datetime=self.start, end_datetime=self.start + timedelta(hours=1),
+            recurrence_type='daily'
+        )
+        for index in range(count):
+            EventException.objects.create(event=series, occurrence_index=index, is_cancelled=True)
+        return series
+
+    def test_deleting_a_series_does_not_query_per_exception(self):
+        few, many = self.series_with_exceptions(1), self.series_with_exceptions(10)
+
+        with CaptureQueriesContext(connection) as few_queries:
+            few.delete()
+        with CaptureQueriesContext(connection) as many_queries:
+            many.delete()
+
+        self.assertEqual(len(many_queries), len(few_queries))
+
+
+class ArchiveEventsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('archive', 'archive@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.start = (timezone.now() - timedelta(days=800)).replace(hour=9, minute=0, second=0, microsecond=0)
+        self.series = Event.objects.create(
+            user=self.user, title='Daily', start_datetime=self.start, end_datetime=self.start + timedelta(hours=1),
+            recurrence_type='daily', recurrence_end_date=(self.start + timedelta(days=9)).date()
+        )
+        EventException.objects.create(event=self.series, occurrence_index=2, is_cancelled=True)
+        moved = self.start + timedelta(days=3, hours=2)
+        EventException.objects.create(
+            event=self.series, occurrence_index=3, title='Moved', start_datetime=moved,
+            end_datetime=moved + timedelta(hours=1)
+        )
+        now = timezone.now()
+        self.current = Event.objects.create(
+            user=self.user, title='Current', start_datetime=now, end_datetime=now + timedelta(hours=1)
+        )
+
+    def archive(self, *args):
+        call_command('archive_events', *args, stdout=StringIO())
+
+    def calendar(self, **params):
+        params.update({
+            'start_date': self.start.date().isoformat(),
+            'end_date': (self.start + timedelta(days=9)).date().isoformat(),
+        })
+        response = self.client.get('/api/events/calendar/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(occurrence['occurrence_index'], occurrence['title']) for occurrence in response.data]
+
+    def test_dry_run_moves_nothing(self):
+        self.archive('--dry-run')
+
+        self.assertTrue(Event.objects.filter(pk=self.series.pk).exists())
+        self.assertFalse(EventArchive.objects.exists())
+
+    def test_archived_series_round_trips_with_its_exceptions(self):
+        before = self.calendar()
+
+        with mock.patch('events.signals.get_hub') as get_hub, self.captureOnCommitCallbacks(execute=True):
+            self.archive()
+
+        self.assertFalse(Event.objects.filter(pk=self.series.pk).exists())
+        self.assertTrue(Event.objects.filter(pk=self.current.pk).exists())
+        self.assertFalse(EventException.objects.exists())
+        self.assertEqual(list(EventArchive.objects.values_list('id', flat=True)), [self.series.pk])
+        actions = {call.args[1]['action'] for call in get_hub.return_value.publish.call_args_list}
+        self.assertEqual(actions, {'archived'})
 
-# Create your tests here.
+        self.assertEqual(self.calendar(), [])
+        self.assertEqual(self.calendar(include_archived='true'), before)
+        self.assertNotIn(2, [index for index, _ in before])
+        self.assertIn((3, 'Moved'), before)
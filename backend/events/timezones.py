@@ -0,0 +1,102 @@
+"""
+Local wall time to UTC conversion backed by a cache of DST transitions.
+
+Converting every occurrence through ``zoneinfo`` is comparatively slow, so
+the UTC offsets a zone uses over a year are worked out once and cached;
+each conversion is then a short bisect over that year's few segments.
+"""
+import bisect
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+UTC_KEYS = ('', 'UTC', 'Etc/UTC')
+
+
+def is_valid_timezone(key):
+    try:
+        ZoneInfo(key)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def get_zone(key):
+    return ZoneInfo(key)
+
+
+def _offset(zone, moment):
+    return moment.astimezone(zone).utcoffset()
+
+
+def _find_transition(zone, low, high):
+    # Narrow [low, high) down to the second the offset changes.
+    before = _offset(zone, low)
+    while high - low > timedelta(seconds=1):
+        middle = low + (high - low) / 2
+        if _offset(zone, middle) == before:
+            low = middle
+        else:
+            high = middle
+    return high.replace(microsecond=0)
+
+
+@lru_cache(maxsize=512)
+def year_transitions(key, year):
+    """
+    The UTC offsets ``key`` uses around ``year`` as ``(walls, offsets)``:
+    ``offsets[i]`` converts naive wall times from ``walls[i]`` up to the next
+    boundary. The span is padded by two days on each side for times near
+    the year edge.
+    """
+    zone = get_zone(key)
+    moment = datetime(year, 1, 1, tzinfo=timezone.utc) - timedelta(days=2)
+    end = datetime(year + 1, 1, 1, tzinfo=timezone.utc) + timedelta(days=2)
+
+    walls = [datetime.min]
+    offsets = [_offset(zone, moment)]
+    step = timedelta(days=1)
+    while moment < end:
+        following = moment + step
+        if _offset(zone, following) != offsets[-1]:
+            transition = _find_transition(zone, moment, following)
+            offset = _offset(zone, transition)
+            # Wall times skipped by a change keep the old offset (landing
+            # just after it) and repeated ones take the first, earlier
+            # instant, as zoneinfo does with fold=0. Either way the new
+            # offset starts at the later of the two wall readings.
+            wall = transition.replace(tzinfo=None) + max(offsets[-1], offset)
+            walls.append(wall)
+            offsets.append(offset)
+        moment = following
+    return tuple(walls), tuple(offsets)
+
+
+class WallClock:
+    """
+    Converts wall times in one zone to UTC, remembering the offset segment
+    of the previous conversion. Recurrence expansion converts times in
+    order, so most calls are a range check and a subtraction.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._low = self._high = self._offset = None
+
+    def to_utc(self, local):
+        if self._low is None or not self._low <= local < self._high:
+            self._load(local)
+        return (local - self._offset).replace(tzinfo=timezone.utc)
+
+    def _load(self, local):
+        walls, offsets = year_transitions(self.key, local.year)
+        index = bisect.bisect_right(walls, local) - 1
+        self._offset = offsets[index]
+        # Stay within the year so the next year's table is used after it.
+        self._low = max(walls[index], datetime(local.year, 1, 1))
+        if index + 1 < len(walls):
+            self._high = min(walls[index + 1], datetime(local.year + 1, 1, 1))
+        else:
+            self._high = datetime(local.year + 1, 1, 1)
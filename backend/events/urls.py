@@ -1,10 +1,17 @@
 from django.urls import path
-from . import views
+from . import stream, views
 
 urlpatterns = [
     path('', views.EventListCreateView.as_view(), name='event-list-create'),
+    path('search/', views.EventSearchView.as_view(), name='event-search'),
     path('<int:pk>/', views.EventDetailView.as_view(), name='event-detail'),
+    path('<int:event_pk>/exceptions/', views.EventExceptionListCreateView.as_view(), name='event-exception-list-create'),
+    path('<int:event_pk>/exceptions/<int:pk>/', views.EventExceptionDetailView.as_view(), name='event-exception-detail'),
     path('calendar/', views.calendar_events, name='calendar-events'),
+    path('calendar/batch/', views.calendar_events_batch, name='calendar-events-batch'),
+    path('team-calendar/', views.team_calendar, name='team-calendar'),
+    path('feed/', views.occurrence_feed, name='occurrence-feed'),
+    path('stream/', stream.event_changes, name='event-stream'),
     path('upcoming/', views.upcoming_events, name='upcoming-events'),
     path('categories/', views.CategoryListCreateView.as_view(), name='category-list-create'),
     path('categories/<int:pk>/', views.CategoryDetailView.as_view(), name='category-detail'),
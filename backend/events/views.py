@@ -1,12 +1,30 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.utils.dateparse import parse_date
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import datetime, date, timedelta
-from .models import Event, Category
-from .serializers import EventSerializer, EventCreateSerializer, EventUpdateSerializer, CategorySerializer
+from dateutil.relativedelta import relativedelta
+import calendar
+import json
+from .models import Event, EventArchive, EventException, Category
+from .serializers import (
+    EventSerializer, EventCreateSerializer, EventUpdateSerializer, EventExceptionSerializer, CategorySerializer,
+    CategoryStatsSerializer
+)
 from .recurrence import RecurrenceGenerator
+from .search import search_events
+from .timezones import UTC_KEYS, get_zone
+from .stats import category_stats
 
 
 class EventListCreateView(generics.ListCreateAPIView):
@@ -18,7 +36,27 @@ class EventListCreateView(generics.ListCreateAPIView):
         return EventSerializer
 
     def get_queryset(self):
-        return Event.objects.filter(user=self.request.user)
+        return self.filter_weekday(Event.objects.filter(user=self.request.user))
+
+    def filter_weekday(self, events):
+        weekday = self.request.GET.get('weekday')
+        if weekday is not None:
+            if not weekday.isdigit() or int(weekday) > 6:
+                raise ValidationError({'error': 'weekday must be 0 (Monday) to 6 (Sunday)'})
+            events = events.on_weekday(int(weekday))
+        return events
+
+    def list(self, request, *args, **kwargs):
+        if not _include_archived(request):
+            return super().list(request, *args, **kwargs)
+
+        events = list(self.get_queryset())
+        archives = self.filter_weekday(
+            EventArchive.objects.filter(user=request.user).select_related('user', 'category')
+        )
+        events.extend(archive.to_event() for archive in archives)
+        events.sort(key=lambda event: event.start_datetime)
+        return Response(self.get_serializer(events, many=True).data)
 
 
 class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -33,14 +71,95 @@ class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Event.objects.filter(user=self.request.user)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def calendar_events(request):
+class EventSearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class EventSearchView(generics.ListAPIView):
+    """
+    Ranked full-text search over the user's events. With ``start_date`` and
+    ``end_date`` only events occurring in that range are returned.
+    """
+    serializer_class = EventSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = EventSearchPagination
+
+    def get_queryset(self):
+        query = self.request.GET.get('q', '').strip()
+        if not query:
+            raise ValidationError({'error': 'q parameter is required'})
+
+        events = Event.objects.filter(user=self.request.user)
+
+        if 'start_date' in self.request.GET or 'end_date' in self.request.GET:
+            start_date, end_date, error = _parse_date_range(self.request)
+            if error:
+                raise ValidationError(error.data)
+            candidates = list(search_events(events, query).in_range(start_date, end_date))
+            occurring = {occurrence['event_id'] for occurrence in _expand_events(candidates, start_date, end_date, 1)}
+            events = events.filter(id__in=occurring)
+
+        return search_events(events, query).select_related('user', 'category')
+
+
+class EventExceptionMixin:
+    serializer_class = EventExceptionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_event(self):
+        if not hasattr(self, '_event'):
+            self._event = get_object_or_404(Event, pk=self.kwargs['event_pk'], user=self.request.user)
+        return self._event
+
+    def get_queryset(self):
+        return EventException.objects.filter(event=self.get_event())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['event'] = self.get_event()
+        return context
+
+
+class EventExceptionListCreateView(EventExceptionMixin, generics.ListCreateAPIView):
+    pass
+
+
+class EventExceptionDetailView(EventExceptionMixin, generics.RetrieveUpdateDestroyAPIView):
+    pass
+
+
+def _include_archived(request):
+    return request.GET.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+
+def _calendar_candidates(request, ranges):
+    """
+    The user's events that may occur in any of the ``(start_date, end_date)``
+    ranges and their exceptions, adding archived events when the request
+    asks for them with ``include_archived``.
+    """
+    events = list(Event.objects.filter(user=request.user).in_ranges(ranges))
+    exceptions = EventException.by_event(events)
+    if _include_archived(request):
+        for archive in EventArchive.objects.filter(user=request.user).in_ranges(ranges):
+            events.append(archive.to_event())
+            exceptions[archive.id] = archive.to_exceptions()
+    return events, exceptions
+
+
+def _parse_date_range(request):
+    """
+    Read the required ``start_date``/``end_date`` query parameters.
+
+    Returns ``(start_date, end_date, None)`` or ``(None, None, error_response)``.
+    """
     start_date_str = request.GET.get('start_date')
     end_date_str = request.GET.get('end_date')
 
     if not start_date_str or not end_date_str:
-        return Response(
+        return None, None, Response(
             {'error': 'start_date and end_date parameters are required'},
             status=status.HTTP_400_BAD_REQUEST
         )
@@ -49,62 +168,467 @@ def calendar_events(request):
         start_date = parse_date(start_date_str)
         end_date = parse_date(end_date_str)
     except ValueError:
-        return Response(
+        start_date = end_date = None
+
+    if start_date is None or end_date is None:
+        return None, None, Response(
             {'error': 'Invalid date format. Use YYYY-MM-DD'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    events = Event.objects.filter(user=request.user)
+    return start_date, end_date, None
+
+
+def _single_occurrence(event):
+    return {
+        'id': event.id,
+        'event_id': event.id,
+        'title': event.title,
+        'description': event.description,
+        'start_datetime': event.start_datetime,
+        'end_datetime': event.end_datetime,
+        'is_recurring': False,
+        'occurrence_index': 0
+    }
+
+
+def _occurrence_date(occurrence, event):
+    """
+    The date ``occurrence`` was selected on when expanding ``event``: one-off
+    events use their UTC date, series the date in their own timezone.
+    """
+    start_datetime = occurrence['start_datetime']
+    if event.recurrence_type == 'none' or event.timezone in UTC_KEYS:
+        return start_datetime.date()
+    return start_datetime.astimezone(get_zone(event.timezone)).date()
+
+
+def _expand_events(events, start_date, end_date, max_count=100, exceptions=None):
+    """
+    Expand ``events`` into occurrence dicts between ``start_date`` and
+    ``end_date``, applying exceptions loaded in one query for all of them.
+    """
+    if exceptions is None:
+        exceptions = EventException.by_event(events)
     all_occurrences = []
 
     for event in events:
         if event.recurrence_type == 'none':
             if start_date <= event.start_datetime.date() <= end_date:
-                all_occurrences.append({
-                    'id': event.id,
-                    'event_id': event.id,
-                    'title': event.title,
-                    'description': event.description,
-                    'start_datetime': event.start_datetime,
-                    'end_datetime': event.end_datetime,
-                    'is_recurring': False,
-                    'occurrence_index': 0
-                })
+                all_occurrences.append(_single_occurrence(event))
         else:
-            generator = RecurrenceGenerator(event)
-            occurrences = generator.generate_occurrences(start_date, end_date)
+            generator = RecurrenceGenerator(event, exceptions.get(event.id))
+            occurrences = generator.generate_occurrences(start_date, end_date, max_count)
             all_occurrences.extend(occurrences)
 
-    all_occurrences.sort(key=lambda x: x['start_datetime'])
+    all_occurrences.sort(key=_occurrence_key)
+    return all_occurrences
+
+
+def _expand_within_budget(events, start_date, end_date, budget, exceptions=None):
+    """
+    Expand ``events`` but stop after roughly ``budget`` occurrences.
+
+    The range is first shortened to the latest end date whose estimated
+    occurrence count fits the budget, so an oversized request never expands
+    more than it returns. Returns ``(occurrences, truncated)``.
+    """
+    if exceptions is None:
+        exceptions = EventException.by_event(events)
+    generators = [RecurrenceGenerator(event, exceptions.get(event.id)) for event in events]
+
+    def estimate(last_date):
+        return sum(generator.estimate_count(start_date, last_date) for generator in generators)
+
+    cutoff = end_date
+    if estimate(end_date) > budget:
+        low, high = 0, (end_date - start_date).days
+        while low < high:
+            middle = (low + high + 1) // 2
+            if estimate(start_date + timedelta(days=middle)) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        cutoff = start_date + timedelta(days=low)
+
+    occurrences = _expand_events(events, start_date, cutoff, budget, exceptions)
+    truncated = cutoff < end_date or len(occurrences) > budget
+    return occurrences[:budget], truncated
+
+
+def _range_too_long(start_date, end_date):
+    if (end_date - start_date).days + 1 > settings.MAX_CALENDAR_RANGE_DAYS:
+        return Response(
+            {'error': f'Date range cannot exceed {settings.MAX_CALENDAR_RANGE_DAYS} days'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return None
+
+
+def _busy_blocks(occurrences):
+    """Merge time-ordered occurrences into non-overlapping busy intervals."""
+    blocks = []
+    for occurrence in occurrences:
+        if blocks and occurrence['start_datetime'] <= blocks[-1]['end_datetime']:
+            blocks[-1]['end_datetime'] = max(blocks[-1]['end_datetime'], occurrence['end_datetime'])
+        else:
+            blocks.append({
+                'start_datetime': occurrence['start_datetime'],
+                'end_datetime': occurrence['end_datetime'],
+            })
+    return blocks
 
-    return Response(all_occurrences)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def calendar_events(request):
+    start_date, end_date, error = _parse_date_range(request)
+    if error:
+        return error
+
+    error = _range_too_long(start_date, end_date)
+    if error:
+        return error
+
+    events, exceptions = _calendar_candidates(request, [(start_date, end_date)])
+    occurrences, truncated = _expand_within_budget(
+        events, start_date, end_date, settings.MAX_OCCURRENCES_PER_REQUEST, exceptions
+    )
+
+    response = Response(occurrences)
+    if truncated:
+        # The body stays a plain list; continue with the feed endpoint.
+        response['X-Occurrences-Truncated'] = 'true'
+        if occurrences:
+            response['X-Next-Cursor'] = _encode_cursor(occurrences[-1])
+    return response
+
+
+MAX_BATCH_WINDOWS = 12
+# Neighbours on each side of the requested window that stay within the limit.
+MAX_BATCH_PREFETCH = (MAX_BATCH_WINDOWS - 1) // 2
+
+
+def _neighbour_windows(start_date, end_date, count):
+    """
+    ``count`` windows on each side of the given one. Whole calendar months
+    step by month; any other window steps by its own length.
+    """
+    month_end = calendar.monthrange(end_date.year, end_date.month)[1]
+    whole_months = start_date.day == 1 and end_date.day == month_end
+    months = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+    length = end_date - start_date + timedelta(days=1)
+
+    windows = []
+    for offset in range(-count, count + 1):
+        if whole_months:
+            window_start = start_date + relativedelta(months=offset * months)
+            window_end = window_start + relativedelta(months=months) - timedelta(days=1)
+        else:
+            window_start = start_date + offset * length
+            window_end = end_date + offset * length
+        windows.append((window_start, window_end))
+    return windows
+
+
+def _merge_windows(windows):
+    """Combine overlapping or adjacent windows into sorted, disjoint ones."""
+    merged = []
+    for window_start, window_end in sorted(windows):
+        if merged and window_start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], window_end))
+        else:
+            merged.append((window_start, window_end))
+    return merged
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def calendar_events_batch(request):
+    """
+    Calendar occurrences for several date windows at once, either listed in
+    ``windows=START:END,START:END`` or given as ``start_date``/``end_date``
+    plus ``prefetch=N`` neighbouring windows on each side. The events and
+    their exceptions are loaded once; each group of overlapping windows is
+    then expanded once, with its own occurrence budget, so gaps between
+    windows cost nothing.
+    """
+    windows = []
+    if request.GET.get('windows'):
+        for window in request.GET['windows'].split(','):
+            window_start, _, window_end = window.partition(':')
+            try:
+                windows.append((parse_date(window_start), parse_date(window_end)))
+            except ValueError:
+                windows.append((None, None))
+        if any(window_start is None or window_end is None for window_start, window_end in windows):
+            return Response(
+                {'error': 'Invalid window. Use YYYY-MM-DD:YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        start_date, end_date, error = _parse_date_range(request)
+        if error:
+            return error
+        try:
+            prefetch = int(request.GET.get('prefetch', 0))
+        except ValueError:
+            prefetch = -1
+        if not 0 <= prefetch <= MAX_BATCH_PREFETCH:
+            return Response(
+                {'error': f'prefetch must be between 0 and {MAX_BATCH_PREFETCH}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        windows = _neighbour_windows(start_date, end_date, prefetch)
+
+    if len(windows) > MAX_BATCH_WINDOWS:
+        return Response(
+            {'error': f'At most {MAX_BATCH_WINDOWS} windows can be requested at once'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if any(window_end < window_start for window_start, window_end in windows):
+        return Response(
+            {'error': 'Window end must not be before its start'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    merged = _merge_windows(windows)
+    covered_days = sum((merged_end - merged_start).days + 1 for merged_start, merged_end in merged)
+    if covered_days > settings.MAX_CALENDAR_RANGE_DAYS:
+        return Response(
+            {'error': f'Windows cannot cover more than {settings.MAX_CALENDAR_RANGE_DAYS} days in total'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    events, exceptions = _calendar_candidates(request, merged)
+    events_by_id = {event.id: event for event in events}
+    truncated = False
+    # (date the occurrence was selected on, occurrence), grouped into the
+    # requested windows on that date rather than the UTC one so each window
+    # matches what calendar_events returns for it.
+    dated = []
+    for merged_start, merged_end in merged:
+        window_occurrences, window_truncated = _expand_within_budget(
+            events, merged_start, merged_end, settings.MAX_OCCURRENCES_PER_REQUEST, exceptions
+        )
+        dated.extend(
+            (_occurrence_date(occurrence, events_by_id[occurrence['event_id']]), occurrence)
+            for occurrence in window_occurrences
+        )
+        truncated = truncated or window_truncated
+
+    return Response({'truncated': truncated, 'windows': [
+        {
+            'start_date': window_start,
+            'end_date': window_end,
+            'occurrences': [
+                occurrence for occurrence_date, occurrence in dated
+                if window_start <= occurrence_date <= window_end
+            ],
+        }
+        for window_start, window_end in windows
+    ]})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def team_calendar(request):
+    """
+    Combined calendar of every member of an auth group the requester belongs
+    to. ``view=busy`` returns merged busy blocks per user instead of events.
+    """
+    group_id = request.GET.get('group_id')
+    if not group_id or not group_id.isdigit():
+        return Response(
+            {'error': 'group_id parameter is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    start_date, end_date, error = _parse_date_range(request)
+    if error:
+        return error
+
+    view = request.GET.get('view', 'events')
+    if view not in ('events', 'busy'):
+        return Response(
+            {'error': 'view must be "events" or "busy"'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    groups = Group.objects.all() if request.user.is_staff else request.user.groups.all()
+    group = get_object_or_404(groups, pk=group_id)
+
+    error = _range_too_long(start_date, end_date)
+    if error:
+        return error
+
+    member_events = Event.objects.filter(user__groups=group)
+    events = list(member_events.in_range(start_date, end_date))
+    occurrences, truncated = _expand_within_budget(
+        events, start_date, end_date, settings.TEAM_CALENDAR_MAX_OCCURRENCES
+    )
+
+    user_ids = {event.id: event.user_id for event in events}
+    for occurrence in occurrences:
+        occurrence['user_id'] = user_ids[occurrence['event_id']]
+
+    if view == 'busy':
+        by_user = {}
+        for occurrence in occurrences:
+            by_user.setdefault(occurrence['user_id'], []).append(occurrence)
+        busy = [
+            {'user_id': user_id, 'blocks': _busy_blocks(user_occurrences)}
+            for user_id, user_occurrences in sorted(by_user.items())
+        ]
+        return Response({'busy': busy, 'truncated': truncated})
+
+    return Response({'occurrences': occurrences, 'truncated': truncated})
+
+
+def _encode_cursor(occurrence):
+    position = [occurrence['start_datetime'].isoformat(), occurrence['event_id'], occurrence['occurrence_index']]
+    return urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def _decode_cursor(cursor):
+    """Return the ``(start_datetime, event_id, occurrence_index)`` a cursor points at, or None."""
+    try:
+        start_str, event_id, occurrence_index = json.loads(urlsafe_b64decode(cursor.encode()))
+        start_datetime = parse_datetime(start_str)
+    except (ValueError, TypeError):
+        return None
+    if start_datetime is None or not isinstance(event_id, int) or not isinstance(occurrence_index, int):
+        return None
+    return start_datetime, event_id, occurrence_index
+
+
+def _occurrence_key(occurrence):
+    return occurrence['start_datetime'], occurrence['event_id'], occurrence['occurrence_index']
+
+
+def _series_after(generator, position, count):
+    """
+    Expand ``generator``'s series far enough to hold its first ``count``
+    occurrences after cursor ``position``.
+
+    Overridden occurrences can be moved before the cursor or far past it,
+    so only regular ones, which come in order, show how far the expansion
+    reached: once ``count`` of them follow the cursor, nothing later can
+    sort ahead of them.
+    """
+    # Start a day early: a series' local date can trail its UTC date.
+    from_date = position[0].date() - timedelta(days=1)
+    max_count = count + 3
+    while True:
+        occurrences = generator.generate_occurrences(from_date, None, max_count)
+        after = [occurrence for occurrence in occurrences if _occurrence_key(occurrence) > position]
+        if len(occurrences) < max_count:
+            # The series ended before the limit.
+            return after
+        regular = [occurrence for occurrence in after if occurrence['occurrence_index'] not in generator.exceptions]
+        if len(regular) >= count:
+            return after
+        max_count *= 2
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def occurrence_feed(request):
+    """
+    Time-ordered stream of the user's occurrences, paged with an opaque
+    cursor. Each page resumes every series directly at the cursor, so the
+    cost of a page does not grow with how far ahead it is.
+    """
+    try:
+        page_size = min(int(request.GET.get('page_size', 50)), 200)
+    except ValueError:
+        page_size = 0
+    if page_size < 1:
+        return Response(
+            {'error': 'page_size must be a positive integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        start = parse_datetime(request.GET.get('start', '')) if request.GET.get('start') else timezone.now()
+        if start is None:
+            return Response(
+                {'error': 'Invalid start. Use an ISO 8601 datetime'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        # Sorts before any real occurrence at ``start``.
+        position = (start, 0, -1)
+
+    position_datetime = position[0]
+    position_date = position_datetime.date()
+    user_events = Event.objects.filter(user=request.user)
+
+    # Only the first page_size + 1 one-off events after the cursor can reach
+    # this page. One-off occurrences all have index 0, so the cursor's
+    # (start, event id) is enough to order them against it.
+    single_events = list(
+        user_events.filter(recurrence_type='none')
+        .filter(
+            Q(start_datetime__gt=position_datetime) |
+            Q(start_datetime=position_datetime, id__gt=position[1])
+        )
+        .order_by('start_datetime', 'id')[:page_size + 1]
+    )
+    series = list(
+        user_events.exclude(recurrence_type='none')
+        .filter(Q(recurrence_end_date__isnull=True) | Q(recurrence_end_date__gte=position_date - timedelta(days=1)))
+    )
+    exceptions = EventException.by_event(series)
+
+    candidates = [_single_occurrence(event) for event in single_events]
+    for event in series:
+        generator = RecurrenceGenerator(event, exceptions.get(event.id))
+        candidates.extend(_series_after(generator, position, page_size + 1))
+
+    page = sorted(candidates, key=_occurrence_key)
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    next_url = None
+    if has_more:
+        next_url = replace_query_param(request.build_absolute_uri(), 'cursor', _encode_cursor(page[-1]))
+
+    return Response({'next': next_url, 'results': page})
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def upcoming_events(request):
-    limit = int(request.GET.get('limit', 10))
+    try:
+        limit = int(request.GET.get('limit', 10))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= settings.MAX_UPCOMING_LIMIT:
+        return Response(
+            {'error': f'limit must be between 1 and {settings.MAX_UPCOMING_LIMIT}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
     today = date.today()
     end_date = today + timedelta(days=30)
 
-    events = Event.objects.filter(user=request.user)
+    events = list(Event.objects.filter(user=request.user))
+    exceptions = EventException.by_event(events)
     all_occurrences = []
 
     for event in events:
         if event.recurrence_type == 'none':
             if event.start_datetime.date() >= today:
-                all_occurrences.append({
-                    'id': event.id,
-                    'event_id': event.id,
-                    'title': event.title,
-                    'description': event.description,
-                    'start_datetime': event.start_datetime,
-                    'end_datetime': event.end_datetime,
-                    'is_recurring': False,
-                    'occurrence_index': 0
-                })
+                all_occurrences.append(_single_occurrence(event))
         else:
-            generator = RecurrenceGenerator(event)
+            generator = RecurrenceGenerator(event, exceptions.get(event.id))
             occurrences = generator.generate_occurrences(today, end_date, limit)
             all_occurrences.extend(occurrences)
 
@@ -113,13 +637,42 @@ def upcoming_events(request):
     return Response(all_occurrences[:limit])
 
 
-class CategoryListCreateView(generics.ListCreateAPIView):
+class OptionalPageNumberPagination(PageNumberPagination):
+    """Paginates only when the client asks for a page, so plain-list clients keep working."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.page_query_param not in request.query_params and self.page_size_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class CategoryStatsMixin:
+    """With ``?stats=true``, adds the requesting user's event and upcoming-occurrence counts."""
+
+    def wants_stats(self):
+        return self.request.method == 'GET' and self.request.GET.get('stats', '').lower() in ('1', 'true', 'yes')
+
+    def get_serializer_class(self):
+        if self.wants_stats():
+            return CategoryStatsSerializer
+        return CategorySerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.wants_stats():
+            context['stats'] = category_stats(self.request.user)
+        return context
+
+
+class CategoryListCreateView(CategoryStatsMixin, generics.ListCreateAPIView):
     queryset = Category.objects.all()
-    serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OptionalPageNumberPagination
 
 
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(CategoryStatsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
-    serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]